@@ -2,11 +2,16 @@
 FastAPI application for the Ready-to-Reform scoring API.
 Provides endpoints to calculate scores for anonymous users.
 """
+import fastapi
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Union
 from datetime import datetime
+from functools import lru_cache
+import asyncio
+import orjson
 import pandas as pd
 import sys
 from pathlib import Path
@@ -14,20 +19,38 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.config import get_sample_events_path, validate_bq_config
-from src.event_schema import Event
+from src.config import (
+    get_sample_events_path,
+    validate_bq_config,
+    SCORE_MAX_BATCH,
+    SCORE_BATCH_WINDOW_MS
+)
+from src.event_schema import Event, Score, json_dumps
 from src.features import FeatureEngineer
 from src.scoring import ReadyToReformScorer
 from src.bq_io import BigQueryIO, load_events_from_csv, BIGQUERY_AVAILABLE
 
 
+# FastAPI 0.131+ serializes response models to JSON bytes through Pydantic
+# and deprecates ORJSONResponse; older releases benefit from orjson
+FASTAPI_VERSION = tuple(int(part) for part in fastapi.__version__.split('.')[:2])
+if FASTAPI_VERSION < (0, 131):
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+else:
+    DefaultResponse = JSONResponse
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Ready-to-Reform Scoring API",
     description="API for calculating Ready-to-Reform scores from omnichannel events",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse
 )
 
+# Responses with at least this many scores are streamed in chunks
+STREAM_MIN_SCORES = 1000
+STREAM_CHUNK_SIZE = 500
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -110,9 +133,243 @@ class ScoreListResponse(BaseModel):
     timestamp: str
 
 
+class ScoreBatcher:
+    """
+    Coalesce concurrent /score calls into a single features + scoring pass.
+    
+    Each request puts its events on a queue and awaits a future. A background
+    worker drains up to `max_batch` requests, waiting at most `window_ms` after
+    the first one arrives, scores the combined events once and hands each
+    request back its own scores.
+    """
+    
+    # Separator used to namespace anon_ids by request inside a batch
+    KEY_SEP = "\x1f"
+    
+    def __init__(
+        self,
+        engineer: FeatureEngineer,
+        scorer: ReadyToReformScorer,
+        max_batch: int = SCORE_MAX_BATCH,
+        window_ms: float = SCORE_BATCH_WINDOW_MS
+    ):
+        """
+        Initialize the batcher.
+        
+        Args:
+            engineer: FeatureEngineer used for every batch
+            scorer: ReadyToReformScorer used for every batch
+            max_batch: Maximum number of requests scored together
+            window_ms: Maximum time (ms) to wait for a batch to fill up
+        """
+        self.engineer = engineer
+        self.scorer = scorer
+        self.max_batch = max(1, max_batch)
+        self.window_ms = window_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        """Start the background worker on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the background worker."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+    
+    async def submit(self, events_df: pd.DataFrame) -> Tuple[List[Score], str]:
+        """
+        Queue events for scoring and wait for the batch result.
+        
+        Args:
+            events_df: Events of a single request
+            
+        Returns:
+            Tuple of (Score objects for the request's anon_ids, ISO timestamp
+            shared by every request of the batch)
+        """
+        if self._worker is None:
+            # Worker not running (e.g. app used without lifespan events)
+            scores = self._score_batch([events_df])[0]
+            return scores, datetime.now().isoformat()
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((events_df, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Worker loop: collect a batch, score it, resolve the futures."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window_ms / 1000.0
+            
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            frames = [events_df for events_df, _ in batch]
+            
+            try:
+                results = await asyncio.to_thread(self._score_batch, frames)
+            except Exception as e:
+                if len(batch) == 1:
+                    results = [e]
+                else:
+                    # One bad request must not fail the others: score each
+                    # request on its own so errors reach only their caller
+                    results = await asyncio.to_thread(self._score_separately, frames)
+            
+            # One timestamp for all responses of the batch
+            timestamp = datetime.now().isoformat()
+            
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result((result, timestamp))
+    
+    def _score_separately(
+        self, 
+        frames: List[pd.DataFrame]
+    ) -> List[Union[List[Score], Exception]]:
+        """
+        Score each request's events in its own pass.
+        
+        Fallback for a batch whose combined pass failed.
+        
+        Args:
+            frames: Events DataFrames, one per request
+            
+        Returns:
+            List with the Score list, or the raised exception, of each request
+        """
+        results: List[Union[List[Score], Exception]] = []
+        
+        for events_df in frames:
+            try:
+                results.append(self._score_batch([events_df])[0])
+            except Exception as e:
+                results.append(e)
+        
+        return results
+    
+    def _score_batch(self, frames: List[pd.DataFrame]) -> List[List[Score]]:
+        """
+        Score the events of several requests in one pass.
+        
+        Args:
+            frames: Events DataFrames, one per request
+            
+        Returns:
+            List of Score lists, in the same order as `frames`
+        """
+        combined = pd.concat(
+            [df.assign(request_id=i) for i, df in enumerate(frames)],
+            ignore_index=True
+        )
+        
+        # Namespace anon_ids by request so the same id sent in two requests
+        # is scored independently
+        combined['anon_id'] = (
+            combined['request_id'].astype(str) + self.KEY_SEP + combined['anon_id'].astype(str)
+        )
+        
+        # Low-cardinality columns as categoricals (concat drops mismatched categories)
+        for col in ('channel', 'event_name'):
+            combined[col] = combined[col].astype('category')
+        
+        features_df = self.engineer.calculate_features(combined)
+        scores = self.scorer.calculate_scores(features_df)
+        
+        # Demultiplex scores back to their requests
+        results: List[List[Score]] = [[] for _ in frames]
+        for score in scores:
+            request_id, anon_id = score.anon_id.split(self.KEY_SEP, 1)
+            score.anon_id = anon_id
+            results[int(request_id)].append(score)
+        
+        return results
+
+
 # Global instances
 engineer = FeatureEngineer()
 scorer = ReadyToReformScorer()
+batcher = ScoreBatcher(engineer, scorer)
+
+
+def _stream_score_list(scores: List[Score], timestamp: str) -> Iterator[bytes]:
+    """
+    Encode a ScoreListResponse body chunk by chunk.
+    
+    Args:
+        scores: List of Score objects
+        timestamp: Response timestamp
+        
+    Yields:
+        JSON bytes; concatenated they form a ScoreListResponse document
+    """
+    yield b'{"scores":['
+    
+    for start in range(0, len(scores), STREAM_CHUNK_SIZE):
+        chunk = b",".join(
+            orjson.dumps({
+                "anon_id": score.anon_id,
+                "score": score.score,
+                "class_label": score.class_label,
+                "top_drivers": score.top_drivers
+            })
+            for score in scores[start:start + STREAM_CHUNK_SIZE]
+        )
+        yield (b"," if start else b"") + chunk
+    
+    yield b'],"count":%d,"timestamp":%s}' % (len(scores), orjson.dumps(timestamp))
+
+
+@lru_cache(maxsize=4)
+def _load_sample_events(path: str, mtime: float) -> pd.DataFrame:
+    """
+    Load and cache the sample events CSV.
+    
+    The file mtime is part of the cache key, so regenerating the sample
+    invalidates the cached frame. The returned frame is shared between
+    requests and must not be modified in place.
+    
+    Args:
+        path: Path to the sample CSV
+        mtime: Modification time of the file
+        
+    Returns:
+        DataFrame with events
+    """
+    return load_events_from_csv(Path(path))
+
+
+@app.on_event("startup")
+async def start_batcher():
+    """Start the /score request batcher."""
+    batcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    """Stop the /score request batcher."""
+    await batcher.stop()
 
 
 @app.get("/")
@@ -160,7 +417,7 @@ async def calculate_score(request: ScoreRequest):
                     detail=f"Sample data not found. Generate it first with: python src/generate_sample_data.py"
                 )
             
-            events_df = load_events_from_csv(sample_path)
+            events_df = _load_sample_events(str(sample_path), sample_path.stat().st_mtime)
             
         elif request.events:
             # Use provided events
@@ -173,8 +430,9 @@ async def calculate_score(request: ScoreRequest):
             events_df['event_time'] = pd.to_datetime(events_df['event_time'])
             
             # Convert event_props dict to JSON string
-            import json
-            events_df['event_props'] = events_df['event_props'].apply(json.dumps)
+            events_df['event_props'] = [
+                json_dumps(props) for props in events_df['event_props'].tolist()
+            ]
             
         elif request.anon_ids:
             # Fetch from BigQuery
@@ -214,28 +472,31 @@ async def calculate_score(request: ScoreRequest):
                 detail="No events found for the given criteria"
             )
         
-        # Calculate features
-        features_df = engineer.calculate_features(events_df)
+        # Calculate features and scores (batched with concurrent requests)
+        scores, timestamp = await batcher.submit(events_df)
         
-        # Calculate scores
-        scores = scorer.calculate_scores(features_df)
+        # Large results are streamed instead of encoded as one buffer
+        if len(scores) >= STREAM_MIN_SCORES:
+            return StreamingResponse(
+                _stream_score_list(scores, timestamp),
+                media_type="application/json"
+            )
         
-        # Format response
-        score_responses = []
-        for score in scores:
-            score_responses.append(
-                ScoreResponse(
-                    anon_id=score.anon_id,
-                    score=score.score,
-                    class_label=score.class_label,
-                    top_drivers=score.top_drivers
-                )
+        # Format response (scores come from the scorer, skip re-validation)
+        score_responses = [
+            ScoreResponse.model_construct(
+                anon_id=score.anon_id,
+                score=score.score,
+                class_label=score.class_label,
+                top_drivers=score.top_drivers
             )
+            for score in scores
+        ]
         
-        return ScoreListResponse(
+        return ScoreListResponse.model_construct(
             scores=score_responses,
             count=len(score_responses),
-            timestamp=datetime.now().isoformat()
+            timestamp=timestamp
         )
         
     except HTTPException:
@@ -4,6 +4,7 @@ Displays rankings, distributions, and score drivers.
 """
 import streamlit as st
 import pandas as pd
+import polars as pl
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
@@ -14,8 +15,9 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.config import get_sample_events_path, validate_bq_config, DATA_DIR
+from src.config import get_sample_events_path, validate_bq_config, DATA_DIR, SCORING_CONFIG
 from src.bq_io import BigQueryIO, load_events_from_csv, BIGQUERY_AVAILABLE
+from src.event_schema import CLASS_LABELS
 
 
 # Page configuration
@@ -42,10 +44,31 @@ data_source = st.sidebar.radio(
 
 use_bigquery = data_source == "BigQuery"
 
+# Columns used by the dashboard (only these are read from local files)
+SCORE_COLUMNS = ["anon_id", "score", "class_label", "top_drivers"]
+
+# Chart color per class
+CLASS_COLORS = {
+    'MOMENTO IDEAL': '#00CC66',
+    'NUTRIR': '#FFB84D',
+    'NÃO ABORDAR': '#FF6B6B'
+}
+
 
 @st.cache_data(ttl=300)
-def load_scores_data(use_bq: bool = False):
-    """Load scores data from BigQuery or local CSV."""
+def load_scores_data(
+    use_bq: bool = False,
+    class_filter: str = None,
+    min_score: float = None,
+    max_score: float = None
+):
+    """
+    Load scores data from BigQuery or local files.
+    
+    Filters are only used with BigQuery, where they are pushed into the query
+    (each filter combination is cached separately). Local files are loaded
+    whole and filtered in the dashboard.
+    """
     try:
         if use_bq:
             if not BIGQUERY_AVAILABLE:
@@ -57,29 +80,32 @@ def load_scores_data(use_bq: bool = False):
                 return None
             
             bq = BigQueryIO()
-            df = bq.get_latest_scores(limit=500)
-            
-            # Parse top_drivers JSON
-            if 'top_drivers' in df.columns:
-                df['top_drivers_parsed'] = df['top_drivers'].apply(
-                    lambda x: json.loads(x) if isinstance(x, str) else x
-                )
+            df = pl.from_pandas(bq.get_latest_scores(
+                limit=500,
+                class_filter=class_filter,
+                min_score=min_score,
+                max_score=max_score
+            ))
         else:
-            # Load from local CSV (latest processed file)
+            # Load from local Parquet/CSV (latest processed file)
             processed_dir = DATA_DIR / "processed"
-            csv_files = sorted(processed_dir.glob("scores_*.csv"), reverse=True)
+            score_files = sorted(
+                [*processed_dir.glob("scores_*.parquet"), *processed_dir.glob("scores_*.csv")],
+                key=lambda p: p.stem,
+                reverse=True
+            )
             
-            if not csv_files:
+            if not score_files:
                 st.warning("Nenhum arquivo de scores encontrado. Execute primeiro: python src/run_daily_score.py --local_sample")
                 return None
             
-            df = pd.read_csv(csv_files[0])
-            
-            # Parse top_drivers JSON
-            if 'top_drivers' in df.columns:
-                df['top_drivers_parsed'] = df['top_drivers'].apply(
-                    lambda x: json.loads(x) if isinstance(x, str) else {}
-                )
+            if score_files[0].suffix == ".parquet":
+                df = pl.read_parquet(score_files[0], columns=SCORE_COLUMNS)
+            else:
+                df = pl.read_csv(score_files[0], columns=SCORE_COLUMNS)
+        
+        # Fixed set of labels: filters compare integer codes, not strings
+        df = df.with_columns(pl.col('class_label').cast(pl.Enum(CLASS_LABELS)))
         
         return df
     
@@ -88,33 +114,20 @@ def load_scores_data(use_bq: bool = False):
         return None
 
 
-# Load data
-with st.spinner("Carregando dados..."):
-    scores_df = load_scores_data(use_bigquery)
-
-if scores_df is None or len(scores_df) == 0:
-    st.info("👈 Configure a fonte de dados na barra lateral")
-    st.stop()
-
 # Filters in sidebar
 st.sidebar.markdown("---")
 st.sidebar.header("🔍 Filtros")
 
 # Class filter
-class_options = ["Todos"] + sorted(scores_df['class_label'].unique().tolist())
+class_options = ["Todos"] + list(CLASS_LABELS)
 selected_class = st.sidebar.selectbox(
     "Classificação:",
     class_options
 )
 
-if selected_class != "Todos":
-    filtered_df = scores_df[scores_df['class_label'] == selected_class]
-else:
-    filtered_df = scores_df
-
 # Score range filter
-min_score = float(scores_df['score'].min())
-max_score = float(scores_df['score'].max())
+min_score = 0.0
+max_score = float(SCORING_CONFIG.max_score)
 
 score_range = st.sidebar.slider(
     "Faixa de score:",
@@ -123,10 +136,32 @@ score_range = st.sidebar.slider(
     value=(min_score, max_score)
 )
 
-filtered_df = filtered_df[
-    (filtered_df['score'] >= score_range[0]) & 
-    (filtered_df['score'] <= score_range[1])
-]
+# Load data (BigQuery applies the filters in the query)
+with st.spinner("Carregando dados..."):
+    if use_bigquery:
+        scores_df = load_scores_data(
+            True,
+            class_filter=selected_class if selected_class != "Todos" else None,
+            min_score=score_range[0],
+            max_score=score_range[1]
+        )
+    else:
+        scores_df = load_scores_data(False)
+
+if scores_df is None or len(scores_df) == 0:
+    st.info("👈 Configure a fonte de dados na barra lateral")
+    st.stop()
+
+# Filters are chained lazily and executed once by Polars
+filtered_lf = scores_df.lazy()
+
+if selected_class != "Todos":
+    filtered_lf = filtered_lf.filter(pl.col('class_label') == selected_class)
+
+filtered_df = filtered_lf.filter(
+    (pl.col('score') >= score_range[0]) & 
+    (pl.col('score') <= score_range[1])
+).collect()
 
 # Top N filter
 top_n = st.sidebar.slider(
@@ -151,7 +186,7 @@ with col1:
     )
 
 with col2:
-    ideal_count = len(filtered_df[filtered_df['class_label'] == 'MOMENTO IDEAL'])
+    ideal_count = int((filtered_df['class_label'] == 'MOMENTO IDEAL').sum())
     ideal_pct = (ideal_count / len(filtered_df) * 100) if len(filtered_df) > 0 else 0
     st.metric(
         "Momento Ideal",
@@ -160,7 +195,7 @@ with col2:
     )
 
 with col3:
-    nurture_count = len(filtered_df[filtered_df['class_label'] == 'NUTRIR'])
+    nurture_count = int((filtered_df['class_label'] == 'NUTRIR').sum())
     nurture_pct = (nurture_count / len(filtered_df) * 100) if len(filtered_df) > 0 else 0
     st.metric(
         "Nutrir",
@@ -169,7 +204,7 @@ with col3:
     )
 
 with col4:
-    avg_score = filtered_df['score'].mean()
+    avg_score = filtered_df['score'].mean() or 0.0
     st.metric(
         "Score Médio",
         f"{avg_score:.1f}",
@@ -185,19 +220,17 @@ with col_left:
     # Top users ranking
     st.subheader(f"🏆 Top {top_n} Usuários por Score")
     
-    top_users = filtered_df.nlargest(top_n, 'score').copy()
+    # Partial sort: only the top N rows are ordered
+    top_users = filtered_df.top_k(top_n, by='score').sort('score', descending=True)
     
     # Create bar chart
     fig_ranking = px.bar(
-        top_users,
+        top_users.to_pandas(),
         x='anon_id',
         y='score',
         color='class_label',
-        color_discrete_map={
-            'MOMENTO IDEAL': '#00CC66',
-            'NUTRIR': '#FFB84D',
-            'NÃO ABORDAR': '#FF6B6B'
-        },
+        color_discrete_map=CLASS_COLORS,
+        category_orders={'class_label': list(CLASS_LABELS)},
         title=f"Top {top_n} Scores",
         labels={'anon_id': 'Usuário Anônimo', 'score': 'Score', 'class_label': 'Classificação'}
     )
@@ -213,8 +246,9 @@ with col_left:
     # Detailed table
     st.subheader("📊 Detalhes dos Top Usuários")
     
-    display_df = top_users[['anon_id', 'score', 'class_label']].copy()
-    display_df['score'] = display_df['score'].round(2)
+    display_df = top_users.select([
+        'anon_id', pl.col('score').round(2), 'class_label'
+    ]).to_pandas()
     
     st.dataframe(
         display_df,
@@ -226,18 +260,15 @@ with col_right:
     # Distribution by class
     st.subheader("📈 Distribuição por Classe")
     
-    class_counts = filtered_df['class_label'].value_counts()
+    class_counts = filtered_df.group_by('class_label').len()
+    class_names = class_counts['class_label'].to_list()
     
+    # One color per slice, aligned with the slice order
     fig_pie = px.pie(
-        values=class_counts.values,
-        names=class_counts.index,
+        values=class_counts['len'].to_list(),
+        names=class_names,
         title="Distribuição de Classificações",
-        color=class_counts.index,
-        color_discrete_map={
-            'MOMENTO IDEAL': '#00CC66',
-            'NUTRIR': '#FFB84D',
-            'NÃO ABORDAR': '#FF6B6B'
-        }
+        color_discrete_sequence=[CLASS_COLORS[name] for name in class_names]
     )
     
     fig_pie.update_traces(textposition='inside', textinfo='percent+label')
@@ -247,7 +278,7 @@ with col_right:
     st.subheader("📊 Distribuição de Scores")
     
     fig_hist = px.histogram(
-        filtered_df,
+        filtered_df.select('score').to_pandas(),
         x='score',
         nbins=20,
         title="Histograma de Scores",
@@ -264,11 +295,11 @@ st.subheader("🎯 Análise de Drivers do Score")
 # User selection
 selected_user = st.selectbox(
     "Selecione um usuário para ver os drivers:",
-    top_users['anon_id'].tolist()
+    top_users['anon_id'].to_list()
 )
 
 if selected_user:
-    user_data = filtered_df[filtered_df['anon_id'] == selected_user].iloc[0]
+    user_data = filtered_df.filter(pl.col('anon_id') == selected_user).row(0, named=True)
     
     col1, col2 = st.columns([1, 2])
     
@@ -278,8 +309,14 @@ if selected_user:
         st.metric("Classificação", user_data['class_label'])
     
     with col2:
-        if 'top_drivers_parsed' in user_data and user_data['top_drivers_parsed']:
-            drivers = user_data['top_drivers_parsed']
+        drivers = user_data.get('top_drivers')
+        if isinstance(drivers, str):
+            # Legacy CSV files store top_drivers as a JSON string
+            drivers = json.loads(drivers)
+        elif drivers:
+            drivers = {d['name']: d['contribution'] for d in drivers}
+        
+        if drivers:
             
             # Create bar chart for drivers
             drivers_df = pd.DataFrame([
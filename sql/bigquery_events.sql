@@ -23,7 +23,7 @@ CREATE TABLE IF NOT EXISTS `{project_id}.{dataset}.scores_ready` (
   score FLOAT64 NOT NULL,
   class_label STRING NOT NULL,  -- MOMENTO IDEAL | NUTRIR | NÃO ABORDAR
   score_date DATE NOT NULL,
-  top_drivers STRING,  -- JSON com os 3 principais componentes do score
+  top_drivers ARRAY<STRUCT<name STRING, contribution FLOAT64>>,  -- 3 principais componentes do score
   created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP()
 )
 PARTITION BY score_date
@@ -2,17 +2,49 @@
 BigQuery I/O operations for the reformas-momento-ideal project.
 Handles reading events and writing scores to BigQuery.
 """
+import importlib.util
 import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
 from typing import Optional, List
 from pathlib import Path
 
-try:
-    from google.cloud import bigquery
-    from google.oauth2 import service_account
-    BIGQUERY_AVAILABLE = True
-except ImportError:
-    BIGQUERY_AVAILABLE = False
+
+def _module_available(name: str) -> bool:
+    """Check if a module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+BIGQUERY_AVAILABLE = (
+    _module_available("google.cloud.bigquery") and 
+    _module_available("google.oauth2.service_account")
+)
+BQ_STORAGE_AVAILABLE = _module_available("google.cloud.bigquery_storage")
+
+# Column types of the events CSV (timestamps are parsed after reading)
+EVENTS_CSV_SCHEMA = {
+    "event_time": pl.String,
+    "channel": pl.Categorical,
+    "anon_id": pl.String,
+    "event_name": pl.Categorical,
+    "event_props": pl.String,
+    "ingestion_time": pl.String,
+}
+
+# Write buffer for CSV output: the Arrow writer emits one small write per
+# record batch, which the buffer coalesces into 1 MiB writes
+CSV_WRITE_BUFFER_BYTES = 1 << 20
+
+# google-cloud modules, imported on first use by _import_bigquery()
+bigquery = None
+service_account = None
+bigquery_storage = None
 
 from .config import (
     BQ_PROJECT_ID, 
@@ -24,6 +56,24 @@ from .config import (
 from .event_schema import Score
 
 
+def _import_bigquery() -> None:
+    """Import the google-cloud client libraries (slow, only done when needed)."""
+    global bigquery, service_account, bigquery_storage
+    
+    if bigquery is not None:
+        return
+    
+    from google.cloud import bigquery as _bigquery
+    from google.oauth2 import service_account as _service_account
+    
+    if BQ_STORAGE_AVAILABLE:
+        from google.cloud import bigquery_storage as _bigquery_storage
+        bigquery_storage = _bigquery_storage
+    
+    service_account = _service_account
+    bigquery = _bigquery
+
+
 class BigQueryIO:
     """Handle BigQuery I/O operations."""
     
@@ -35,12 +85,16 @@ class BigQueryIO:
                 "Install it with: pip install google-cloud-bigquery"
             )
         
+        _import_bigquery()
+        
         self.project_id = BQ_PROJECT_ID
         self.dataset = BQ_DATASET
         
         # Initialize client
         credentials_path = get_bq_credentials_path()
         
+        credentials = None
+        
         if credentials_path:
             credentials = service_account.Credentials.from_service_account_file(
                 str(credentials_path)
@@ -52,12 +106,46 @@ class BigQueryIO:
         else:
             # Use default credentials
             self.client = bigquery.Client(project=self.project_id)
+        
+        # Storage Read API client: streams results as Arrow record batches
+        # instead of paginating JSON rows through the REST API
+        self.bqstorage_client = None
+        if BQ_STORAGE_AVAILABLE:
+            self.bqstorage_client = bigquery_storage.BigQueryReadClient(
+                credentials=credentials
+            )
+    
+    def _query_to_dataframe(
+        self, 
+        query: str, 
+        job_config: Optional["bigquery.QueryJobConfig"] = None
+    ) -> pd.DataFrame:
+        """
+        Run a query and fetch the results as an Arrow table.
+        
+        Args:
+            query: SQL query
+            job_config: Optional query job configuration
+            
+        Returns:
+            DataFrame with query results
+        """
+        rows = self.client.query(query, job_config=job_config).result()
+        
+        if self.bqstorage_client is not None:
+            table = rows.to_arrow(bqstorage_client=self.bqstorage_client)
+        else:
+            table = rows.to_arrow(create_bqstorage_client=False)
+        
+        # self_destruct frees Arrow buffers while converting to lower peak memory
+        return table.to_pandas(self_destruct=True, split_blocks=True)
     
     def read_events(
         self, 
         start_date: datetime, 
         end_date: Optional[datetime] = None,
-        anon_ids: Optional[List[str]] = None
+        anon_ids: Optional[List[str]] = None,
+        order_by: bool = False
     ) -> pd.DataFrame:
         """
         Read events from BigQuery.
@@ -66,6 +154,9 @@ class BigQueryIO:
             start_date: Start date for events
             end_date: End date for events (default: now)
             anon_ids: Optional list of anon_ids to filter
+            order_by: If True, sort events by event_time (newest first).
+                      Feature engineering does not need sorted input, so this
+                      is off by default to spare BigQuery the sort
             
         Returns:
             DataFrame with events
@@ -89,22 +180,25 @@ class BigQueryIO:
           AND DATE(event_time) <= @end_date
         """
         
+        # Set up query parameters
+        query_parameters = [
+            bigquery.ScalarQueryParameter("start_date", "DATE", start_date.date()),
+            bigquery.ScalarQueryParameter("end_date", "DATE", end_date.date()),
+        ]
+        
         if anon_ids:
-            anon_ids_str = "', '".join(anon_ids)
-            query += f" AND anon_id IN ('{anon_ids_str}')"
+            query += " AND anon_id IN UNNEST(@anon_ids)"
+            query_parameters.append(
+                bigquery.ArrayQueryParameter("anon_ids", "STRING", list(anon_ids))
+            )
         
-        query += " ORDER BY event_time DESC"
+        if order_by:
+            query += " ORDER BY event_time DESC"
         
-        # Set up query parameters
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("start_date", "DATE", start_date.date()),
-                bigquery.ScalarQueryParameter("end_date", "DATE", end_date.date()),
-            ]
-        )
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
         
         # Execute query
-        df = self.client.query(query, job_config=job_config).to_dataframe()
+        df = self._query_to_dataframe(query, job_config=job_config)
         
         return df
     
@@ -121,9 +215,8 @@ class BigQueryIO:
         
         table_ref = f"{self.project_id}.{self.dataset}.{BQ_SCORES_TABLE}"
         
-        # Convert scores to DataFrame
-        scores_data = [s.to_dict() for s in scores]
-        df = pd.DataFrame(scores_data)
+        # Convert scores to DataFrame (top_drivers as repeated records)
+        df = scores_to_records_dataframe(scores)
         
         # Write to BigQuery
         job_config = bigquery.LoadJobConfig(
@@ -133,7 +226,13 @@ class BigQueryIO:
                 bigquery.SchemaField("score", "FLOAT64", mode="REQUIRED"),
                 bigquery.SchemaField("class_label", "STRING", mode="REQUIRED"),
                 bigquery.SchemaField("score_date", "DATE", mode="REQUIRED"),
-                bigquery.SchemaField("top_drivers", "STRING", mode="NULLABLE"),
+                bigquery.SchemaField(
+                    "top_drivers", "RECORD", mode="REPEATED",
+                    fields=[
+                        bigquery.SchemaField("name", "STRING"),
+                        bigquery.SchemaField("contribution", "FLOAT64"),
+                    ]
+                ),
             ]
         )
         
@@ -148,7 +247,9 @@ class BigQueryIO:
     def get_latest_scores(
         self, 
         limit: int = 50,
-        class_filter: Optional[str] = None
+        class_filter: Optional[str] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None
     ) -> pd.DataFrame:
         """
         Get latest scores from BigQuery.
@@ -156,6 +257,8 @@ class BigQueryIO:
         Args:
             limit: Maximum number of scores to return
             class_filter: Optional filter by class_label
+            min_score: Optional minimum score (inclusive)
+            max_score: Optional maximum score (inclusive)
             
         Returns:
             DataFrame with latest scores
@@ -174,12 +277,33 @@ class BigQueryIO:
         WHERE score_date = (SELECT MAX(score_date) FROM `{table_ref}`)
         """
         
+        query_parameters = [
+            bigquery.ScalarQueryParameter("limit", "INT64", int(limit)),
+        ]
+        
         if class_filter:
-            query += f" AND class_label = '{class_filter}'"
+            query += " AND class_label = @class_filter"
+            query_parameters.append(
+                bigquery.ScalarQueryParameter("class_filter", "STRING", class_filter)
+            )
         
-        query += f" ORDER BY score DESC LIMIT {limit}"
+        if min_score is not None:
+            query += " AND score >= @min_score"
+            query_parameters.append(
+                bigquery.ScalarQueryParameter("min_score", "FLOAT64", float(min_score))
+            )
         
-        df = self.client.query(query).to_dataframe()
+        if max_score is not None:
+            query += " AND score <= @max_score"
+            query_parameters.append(
+                bigquery.ScalarQueryParameter("max_score", "FLOAT64", float(max_score))
+            )
+        
+        query += " ORDER BY score DESC LIMIT @limit"
+        
+        job_config = bigquery.QueryJobConfig(query_parameters=query_parameters)
+        
+        df = self._query_to_dataframe(query, job_config=job_config)
         
         return df
     
@@ -211,18 +335,80 @@ def load_events_from_csv(csv_path: Path) -> pd.DataFrame:
     Returns:
         DataFrame with events
     """
-    df = pd.read_csv(csv_path)
+    # Polars parses the CSV with multiple threads using the known schema (no
+    # type inference pass); channel/event_name are read straight into
+    # categoricals. Convert to pandas only at the feature-pipeline boundary
+    df = pl.read_csv(csv_path, schema_overrides=EVENTS_CSV_SCHEMA, infer_schema=False)
+    
+    # Parse datetime columns (one vectorized pass per column)
+    datetime_cols = [c for c in ('event_time', 'ingestion_time') if c in df.columns]
+    if datetime_cols:
+        df = df.with_columns(pl.col(c).str.to_datetime() for c in datetime_cols)
     
-    # Parse datetime columns
-    if 'event_time' in df.columns:
-        df['event_time'] = pd.to_datetime(df['event_time'])
+    return df.to_pandas()
+
+
+def scores_to_records_dataframe(scores: List[Score]) -> pd.DataFrame:
+    """
+    Convert scores to a DataFrame with top_drivers as structured records.
     
-    if 'ingestion_time' in df.columns:
-        df['ingestion_time'] = pd.to_datetime(df['ingestion_time'])
+    top_drivers becomes a list of {"name", "contribution"} records, matching
+    the REPEATED RECORD column in BigQuery and a list<struct> column in
+    Parquet, so readers get it already parsed.
     
+    Args:
+        scores: List of Score objects
+        
+    Returns:
+        DataFrame with score data
+    """
+    df = pd.DataFrame([s.to_dict() for s in scores])
+    df['top_drivers'] = [
+        [{"name": name, "contribution": value} for name, value in s.top_drivers.items()]
+        for s in scores
+    ]
     return df
 
 
+def save_scores_to_parquet(
+    scores: List[Score], 
+    parquet_path: Path,
+    compression: str = "zstd"
+) -> None:
+    """
+    Save scores to a Parquet file (for local testing).
+    
+    Args:
+        scores: List of Score objects
+        parquet_path: Path to save Parquet file
+        compression: Parquet compression codec
+    """
+    df = scores_to_records_dataframe(scores)
+    df.to_parquet(parquet_path, engine="pyarrow", compression=compression, index=False)
+    print(f"Saved {len(scores)} scores to {parquet_path}")
+
+
+def load_scores_from_parquet(parquet_path: Path) -> List[Score]:
+    """
+    Load scores saved by save_scores_to_parquet.
+    
+    Args:
+        parquet_path: Path to the Parquet file
+        
+    Returns:
+        List of Score objects
+    """
+    scores = []
+    
+    for row in pq.read_table(parquet_path).to_pylist():
+        row['top_drivers'] = {
+            driver['name']: driver['contribution'] for driver in row['top_drivers']
+        }
+        scores.append(Score.from_dict(row))
+    
+    return scores
+
+
 def save_scores_to_csv(scores: List[Score], csv_path: Path) -> None:
     """
     Save scores to a CSV file (for local testing).
@@ -233,5 +419,10 @@ def save_scores_to_csv(scores: List[Score], csv_path: Path) -> None:
     """
     scores_data = [s.to_dict() for s in scores]
     df = pd.DataFrame(scores_data)
-    df.to_csv(csv_path, index=False)
+    
+    # Arrow's C++ CSV writer instead of the pandas writer, through a buffered
+    # stream that is flushed once on close
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.output_stream(str(csv_path), buffer_size=CSV_WRITE_BUFFER_BYTES) as sink:
+        pa_csv.write_csv(table, sink)
     print(f"Saved {len(scores)} scores to {csv_path}")
@@ -12,6 +12,7 @@ from dataclasses import dataclass
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 SAMPLE_DIR = DATA_DIR / "sample"
+CACHE_DIR = DATA_DIR / "cache"
 SQL_DIR = PROJECT_ROOT / "sql"
 
 # BigQuery configuration
@@ -23,6 +24,10 @@ BQ_SCORES_TABLE = "scores_ready"
 # Credentials
 BQ_CREDENTIALS_JSON = os.getenv("BQ_CREDENTIALS_JSON", "")
 
+# API request batching (concurrent /score calls are scored together)
+SCORE_MAX_BATCH = int(os.getenv("SCORE_MAX_BATCH", "32"))
+SCORE_BATCH_WINDOW_MS = float(os.getenv("SCORE_BATCH_WINDOW_MS", "20"))
+
 
 @dataclass
 class FeatureConfig:
@@ -53,6 +58,13 @@ class FeatureConfig:
     
     # Cart abandonment window (hours)
     cart_abandon_hours: int = 24
+    
+    def __post_init__(self):
+        """Precompute hashed lookups for event and bundle membership checks."""
+        self.high_intent_set = frozenset(self.high_intent_events)
+        self.bundle_sets = tuple(
+            frozenset(c.lower() for c in bundle) for bundle in self.reform_bundles
+        )
 
 
 @dataclass
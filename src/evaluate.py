@@ -5,6 +5,7 @@ Módulo para avaliação de modelos de machine learning.
 import pandas as pd
 import numpy as np
 import joblib
+from concurrent.futures import ThreadPoolExecutor
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.metrics import (
@@ -14,12 +15,18 @@ from sklearn.metrics import (
     precision_score,
     recall_score,
     f1_score,
-    roc_auc_score,
     roc_curve
 )
 from config import MODEL_FILE, PROCESSED_DATA_FILE
 
 
+# Abaixo deste tamanho de teste as métricas são calculadas em sequência
+PARALLEL_METRICS_MIN_ROWS = 10_000
+
+# Maior rótulo inteiro (+1) para a matriz de confusão via np.bincount
+FAST_CM_MAX_CLASSES = 256
+
+
 def load_model(file_path=None):
     """
     Carrega modelo treinado.
@@ -38,6 +45,38 @@ def load_model(file_path=None):
     return model
 
 
+def roc_and_auc(y_true, scores):
+    """
+    Calcula curva ROC e AUC com uma única ordenação dos scores.
+    
+    Scores empatados formam um único ponto da curva, como no roc_curve
+    do sklearn, e a AUC é integrada pela regra do trapézio.
+    
+    Args:
+        y_true: Target binário (True/1 = classe positiva)
+        scores: Score/probabilidade da classe positiva
+    
+    Returns:
+        Tupla (fpr, tpr, auc)
+    """
+    y_true = np.asarray(y_true)
+    scores = np.asarray(scores)
+    
+    order = np.argsort(-scores, kind='stable')
+    sorted_scores = scores[order]
+    
+    # Último índice de cada limiar distinto
+    thresholds = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1]
+    tp = np.cumsum(y_true[order].astype(np.int64))[thresholds]
+    fp = thresholds + 1 - tp
+    
+    tpr = np.r_[0.0, tp / tp[-1]]
+    fpr = np.r_[0.0, fp / fp[-1]]
+    auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2.0)
+    
+    return fpr, tpr, auc
+
+
 def evaluate_model(model, X_test, y_test):
     """
     Avalia o modelo e retorna métricas.
@@ -52,20 +91,53 @@ def evaluate_model(model, X_test, y_test):
     """
     print("Avaliando modelo...")
     
-    # Predições
-    y_pred = model.predict(X_test)
-    y_pred_proba = model.predict_proba(X_test)[:, 1] if hasattr(model, 'predict_proba') else None
-    
-    # Calcular métricas
-    metrics = {
-        'accuracy': accuracy_score(y_test, y_pred),
-        'precision': precision_score(y_test, y_pred, average='weighted'),
-        'recall': recall_score(y_test, y_pred, average='weighted'),
-        'f1': f1_score(y_test, y_pred, average='weighted')
+    # Predições (uma única passada: predict = argmax de predict_proba)
+    if hasattr(model, 'predict_proba'):
+        proba = model.predict_proba(X_test)
+        y_pred = model.classes_[proba.argmax(axis=1)]
+        y_pred_proba = proba[:, 1] if proba.shape[1] == 2 else None
+    else:
+        y_pred = model.predict(X_test)
+        y_pred_proba = None
+    
+    # Classes do teste calculadas uma única vez e reutilizadas pelas métricas
+    y_true = np.asarray(y_test)
+    y_hat = np.asarray(y_pred)
+    classes = np.unique(y_true)
+    
+    # Rótulos inteiros pequenos em int8: menos bytes lidos em cada métrica
+    int8 = np.iinfo(np.int8)
+    if (len(classes) > 0 and np.issubdtype(y_true.dtype, np.integer)
+            and np.issubdtype(y_hat.dtype, np.integer)
+            and int8.min <= min(classes[0], y_hat.min())
+            and max(classes[-1], y_hat.max()) <= int8.max):
+        y_true = y_true.astype(np.int8, copy=False)
+        y_hat = y_hat.astype(np.int8, copy=False)
+        classes = classes.astype(np.int8)
+    
+    # Calcular métricas (em paralelo para testes grandes)
+    tasks = {
+        'accuracy': (accuracy_score, (y_true, y_hat), {}),
+        'precision': (precision_score, (y_true, y_hat), {'average': 'weighted', 'labels': classes}),
+        'recall': (recall_score, (y_true, y_hat), {'average': 'weighted', 'labels': classes}),
+        'f1': (f1_score, (y_true, y_hat), {'average': 'weighted', 'labels': classes})
     }
     
-    if y_pred_proba is not None and len(np.unique(y_test)) == 2:
-        metrics['roc_auc'] = roc_auc_score(y_test, y_pred_proba)
+    if y_pred_proba is not None and len(classes) == 2:
+        # Classe positiva = maior rótulo, como no roc_auc_score
+        tasks['roc_auc'] = (
+            lambda y, s: roc_and_auc(y, s)[2], (y_true == classes[1], y_pred_proba), {}
+        )
+    
+    if len(y_test) < PARALLEL_METRICS_MIN_ROWS:
+        metrics = {name: fn(*args, **kwargs) for name, (fn, args, kwargs) in tasks.items()}
+    else:
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            futures = {
+                name: executor.submit(fn, *args, **kwargs)
+                for name, (fn, args, kwargs) in tasks.items()
+            }
+            metrics = {name: future.result() for name, future in futures.items()}
     
     return metrics, y_pred, y_pred_proba
 
@@ -82,6 +154,24 @@ def print_metrics(metrics):
         print(f"{metric_name.capitalize()}: {metric_value:.4f}")
 
 
+def _fast_cm(y_true, y_pred, n_classes):
+    """
+    Matriz de confusão para rótulos inteiros em [0, n_classes) com um único bincount.
+    
+    Args:
+        y_true: Target real (inteiros)
+        y_pred: Predições (inteiros)
+        n_classes: Número de classes K
+    
+    Returns:
+        Matriz K x K (linhas = real, colunas = predito)
+    """
+    return np.bincount(
+        n_classes * y_true.astype(np.int64) + y_pred.astype(np.int64),
+        minlength=n_classes * n_classes
+    ).reshape(n_classes, n_classes)
+
+
 def plot_confusion_matrix(y_test, y_pred, save_path=None):
     """
     Plota a matriz de confusão.
@@ -91,7 +181,18 @@ def plot_confusion_matrix(y_test, y_pred, save_path=None):
         y_pred: Predições
         save_path: Caminho para salvar o gráfico (opcional)
     """
-    cm = confusion_matrix(y_test, y_pred)
+    y_true = np.asarray(y_test)
+    y_hat = np.asarray(y_pred)
+    
+    if (len(y_true) > 0 and y_true.dtype.kind in 'iu' and y_hat.dtype.kind in 'iu'
+            and min(y_true.min(), y_hat.min()) >= 0
+            and max(y_true.max(), y_hat.max()) < FAST_CM_MAX_CLASSES):
+        cm = _fast_cm(y_true, y_hat, int(max(y_true.max(), y_hat.max())) + 1)
+        # Mantém só as classes presentes, como o confusion_matrix do sklearn
+        present = (cm.sum(axis=0) + cm.sum(axis=1)) > 0
+        cm = cm[np.ix_(present, present)]
+    else:
+        cm = confusion_matrix(y_test, y_pred)
     
     plt.figure(figsize=(8, 6))
     sns.heatmap(cm, annot=True, fmt='d', cmap='Blues')
@@ -108,16 +209,18 @@ def plot_confusion_matrix(y_test, y_pred, save_path=None):
     plt.close()
 
 
-def print_classification_report(y_test, y_pred):
+def print_classification_report(y_test, y_pred, labels=None):
     """
     Imprime o relatório de classificação.
     
     Args:
         y_test: Target real
         y_pred: Predições
+        labels: Classes já calculadas (ex.: np.unique(y_test)), evita
+                recalculá-las (opcional)
     """
     print("\n=== Relatório de Classificação ===")
-    print(classification_report(y_test, y_pred))
+    print(classification_report(y_test, y_pred, labels=labels))
 
 
 def main():
@@ -5,10 +5,44 @@ Defines the structure of events and provides utilities for parsing and validatio
 import json
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Iterator
 
+import pandas as pd
 
-@dataclass
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    def parse_datetime(value: str) -> datetime:
+        """Parse an ISO 8601 string (fallback when ciso8601 is not installed)."""
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+# Score classes, from most to least ready
+CLASS_LABELS = ("MOMENTO IDEAL", "NUTRIR", "NÃO ABORDAR")
+
+
+def json_dumps(obj: Any) -> str:
+    """Serialize obj to a JSON string (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj).decode()
+        except orjson.JSONEncodeError:
+            # orjson rejects ints beyond 64 bits and non-str keys; json accepts both
+            pass
+    return json.dumps(obj)
+
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the latter
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+
+@dataclass(slots=True)
 class Event:
     """
     Represents a single event in the omnichannel system.
@@ -47,7 +81,7 @@ class Event:
         # Parse event_time
         event_time = data.get("event_time")
         if isinstance(event_time, str):
-            event_time = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
+            event_time = parse_datetime(event_time)
         elif not isinstance(event_time, datetime):
             raise ValueError("event_time must be a datetime or ISO string")
         
@@ -55,13 +89,13 @@ class Event:
         ingestion_time = data.get("ingestion_time")
         if ingestion_time:
             if isinstance(ingestion_time, str):
-                ingestion_time = datetime.fromisoformat(ingestion_time.replace('Z', '+00:00'))
+                ingestion_time = parse_datetime(ingestion_time)
         
         # Parse event_props if it's a JSON string
         event_props = data.get("event_props", {})
         if isinstance(event_props, str):
             try:
-                event_props = json.loads(event_props) if event_props else {}
+                event_props = json_loads(event_props) if event_props else {}
             except json.JSONDecodeError:
                 event_props = {}
         
@@ -74,6 +108,53 @@ class Event:
             ingestion_time=ingestion_time
         )
     
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> Iterator["Event"]:
+        """
+        Create Events from a DataFrame of raw event rows.
+        
+        Timestamps are parsed once per column and event_props in a single
+        pass, instead of per row as in from_dict.
+        
+        Args:
+            df: DataFrame with columns: event_time, channel, anon_id,
+                event_name, event_props and optionally ingestion_time
+            
+        Yields:
+            Event instances, in row order
+        """
+        event_times = pd.to_datetime(df['event_time'], format='ISO8601', cache=True).tolist()
+        
+        if 'ingestion_time' in df:
+            ingestion_times = pd.to_datetime(
+                df['ingestion_time'], format='ISO8601', cache=True
+            ).astype(object).where(df['ingestion_time'].notna(), None).tolist()
+        else:
+            ingestion_times = [None] * len(df)
+        
+        event_props = [
+            safe_parse_json(props) if isinstance(props, str)
+            else props if isinstance(props, dict) else {}
+            for props in df['event_props'].tolist()
+        ]
+        
+        for event_time, channel, anon_id, event_name, props, ingestion_time in zip(
+            event_times,
+            df['channel'].tolist(),
+            df['anon_id'].tolist(),
+            df['event_name'].tolist(),
+            event_props,
+            ingestion_times
+        ):
+            yield cls(
+                event_time=event_time,
+                channel=channel,
+                anon_id=anon_id,
+                event_name=event_name,
+                event_props=props,
+                ingestion_time=ingestion_time
+            )
+    
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert Event to dictionary for serialization.
@@ -86,7 +167,7 @@ class Event:
             "channel": self.channel,
             "anon_id": self.anon_id,
             "event_name": self.event_name,
-            "event_props": json.dumps(self.event_props) if self.event_props else "{}",
+            "event_props": json_dumps(self.event_props) if self.event_props else "{}",
             "ingestion_time": self.ingestion_time.isoformat() if self.ingestion_time else None
         }
     
@@ -104,7 +185,7 @@ class Event:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class Score:
     """
     Represents a Ready-to-Reform score for an anonymous user.
@@ -127,7 +208,7 @@ class Score:
             "score": self.score,
             "class_label": self.class_label,
             "score_date": self.score_date.date().isoformat() if isinstance(self.score_date, datetime) else self.score_date,
-            "top_drivers": json.dumps(self.top_drivers)
+            "top_drivers": json_dumps(self.top_drivers)
         }
     
     @classmethod
@@ -143,12 +224,12 @@ class Score:
         """
         score_date = data.get("score_date")
         if isinstance(score_date, str):
-            score_date = datetime.fromisoformat(score_date)
+            score_date = parse_datetime(score_date)
         
         top_drivers = data.get("top_drivers", {})
         if isinstance(top_drivers, str):
             try:
-                top_drivers = json.loads(top_drivers)
+                top_drivers = json_loads(top_drivers)
             except json.JSONDecodeError:
                 top_drivers = {}
         
@@ -175,6 +256,6 @@ def safe_parse_json(json_str: Optional[str]) -> Dict[str, Any]:
         return {}
     
     try:
-        return json.loads(json_str)
+        return json_loads(json_str)
     except (json.JSONDecodeError, TypeError):
         return {}
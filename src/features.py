@@ -5,24 +5,40 @@ Calculates features from events to predict the ideal moment for reform.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from collections import Counter
+from typing import Optional, Tuple
+
+try:
+    from joblib import Parallel, delayed, effective_n_jobs
+    JOBLIB_AVAILABLE = True
+except ImportError:
+    JOBLIB_AVAILABLE = False
 
 from .config import FEATURE_CONFIG
-from .event_schema import Event, safe_parse_json
+from .event_schema import safe_parse_json
 
 
 class FeatureEngineer:
     """Feature engineering for Ready-to-Reform scoring."""
     
-    def __init__(self, config=FEATURE_CONFIG):
+    def __init__(self, config=FEATURE_CONFIG, n_jobs: int = 1):
         """
         Initialize the feature engineer.
         
         Args:
             config: FeatureConfig instance with configuration parameters
+            n_jobs: Number of joblib worker processes; users are split into
+                    n_jobs partitions aggregated in parallel. 1 (default)
+                    computes everything in-process, -1 uses all cores
         """
         self.config = config
+        self.n_jobs = n_jobs
+        
+        # Bundle categories as column positions of a presence matrix
+        self._bundle_categories = pd.Index(sorted(set().union(*config.bundle_sets)))
+        self._bundle_columns = [
+            self._bundle_categories.get_indexer(sorted(bundle_set))
+            for bundle_set in config.bundle_sets
+        ]
     
     def calculate_features(
         self, 
@@ -45,248 +61,230 @@ class FeatureEngineer:
         
         # Ensure event_time is datetime
         if not pd.api.types.is_datetime64_any_dtype(events['event_time']):
-            events['event_time'] = pd.to_datetime(events['event_time'])
-        
-        # Parse event_props JSON
-        events['event_props_parsed'] = events['event_props'].apply(safe_parse_json)
-        
-        # Extract category from event_props
-        events['category'] = events['event_props_parsed'].apply(
-            lambda x: x.get('category') if isinstance(x, dict) else None
-        )
+            events['event_time'] = pd.to_datetime(
+                events['event_time'], format='ISO8601', cache=True
+            )
         
-        # Calculate features by anon_id
-        features_list = []
+        # Extract category straight from the raw event_props JSON
+        events['category'] = self._extract_category(events['event_props'])
         
-        for anon_id in events['anon_id'].unique():
-            user_events = events[events['anon_id'] == anon_id].copy()
-            user_events = user_events.sort_values('event_time')
-            
-            features = self._calculate_user_features(user_events, reference_date)
-            features['anon_id'] = anon_id
-            features_list.append(features)
+        # Low-cardinality columns as categoricals (isin/== compare integer codes)
+        for column in ('channel', 'event_name', 'category'):
+            events[column] = events[column].astype('category')
         
-        features_df = pd.DataFrame(features_list)
+        features_df = self._compute_features(events, reference_date)
         
         # Fill NaN values with 0
         features_df = features_df.fillna(0)
         
         return features_df
     
-    def _calculate_user_features(
-        self, 
-        user_events: pd.DataFrame, 
-        reference_date: datetime
-    ) -> Dict[str, Any]:
+    def _extract_category(self, event_props: pd.Series) -> pd.Series:
         """
-        Calculate features for a single user.
+        Extract the top-level category field from raw event_props JSON strings.
+        
+        Each row is parsed once in a plain loop over the values (no
+        intermediate column of parsed dicts).
         
         Args:
-            user_events: DataFrame with events for one anon_id
-            reference_date: Reference date for calculations
+            event_props: Series of event_props JSON strings
             
         Returns:
-            Dictionary with calculated features
+            Series with the category of each event (None if absent)
         """
-        features = {}
-        
-        # Recency features
-        features['recency_days'] = self._calculate_recency(user_events, reference_date)
+        categories = [
+            props.get('category') if isinstance(props, dict) else None
+            for props in map(safe_parse_json, event_props.tolist())
+        ]
         
-        # Frequency features
-        features['freq_7d'] = self._calculate_frequency(
-            user_events, reference_date, self.config.window_7d
-        )
-        features['freq_14d'] = self._calculate_frequency(
-            user_events, reference_date, self.config.window_14d
-        )
-        features['freq_30d'] = self._calculate_frequency(
-            user_events, reference_date, self.config.window_30d
-        )
-        
-        # High intent features
-        features['high_intent_7d'] = self._calculate_high_intent(
-            user_events, reference_date, self.config.window_7d
-        )
-        
-        # Category diversity
-        features['category_diversity_14d'] = self._calculate_category_diversity(
-            user_events, reference_date, self.config.window_14d
-        )
-        
-        # Cart abandonment
-        features['cart_abandon_7d'] = self._calculate_cart_abandon(
-            user_events, reference_date, self.config.window_7d
-        )
-        
-        # Reform bundles
-        features['reform_bundle_14d'] = self._calculate_reform_bundle(
-            user_events, reference_date, self.config.window_14d
-        )
-        
-        return features
+        return pd.Series(categories, index=event_props.index, dtype=object)
     
-    def _calculate_recency(
+    def _compute_features(
         self, 
-        user_events: pd.DataFrame, 
+        events: pd.DataFrame, 
         reference_date: datetime
-    ) -> float:
+    ) -> pd.DataFrame:
         """
-        Calculate days since last relevant event.
+        Aggregate features in-process or across joblib workers.
         
         Args:
-            user_events: User's events DataFrame
-            reference_date: Reference date
+            events: Events DataFrame with parsed event_time and category
+            reference_date: Reference date for calculations
             
         Returns:
-            Days since last event (lower is better)
+            DataFrame with one row of features per anon_id
         """
-        if len(user_events) == 0:
-            return 999.0  # Very high value for no events
+        user_codes, unique_ids = pd.factorize(events['anon_id'])
+        n_jobs = effective_n_jobs(self.n_jobs) if JOBLIB_AVAILABLE else 1
+        n_jobs = min(n_jobs, len(unique_ids))
+        
+        if n_jobs < 2 or len(unique_ids) < 3:
+            return self._aggregate_features(events, reference_date)
+        
+        # Contiguous user partitions keep the first-appearance row order
+        partition = user_codes * n_jobs // len(unique_ids)
+        results = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(self._aggregate_features)(chunk, reference_date)
+            for _, chunk in events.groupby(partition, sort=True)
+        )
         
-        last_event = user_events['event_time'].max()
-        days_diff = (reference_date - last_event).total_seconds() / 86400.0
-        return max(0.0, days_diff)
+        return pd.concat(results, ignore_index=True)
     
-    def _calculate_frequency(
-        self, 
-        user_events: pd.DataFrame, 
-        reference_date: datetime, 
-        window_days: int
-    ) -> int:
+    def _window_cutoffs(self, reference_ts: pd.Timestamp) -> Tuple[pd.Timestamp, ...]:
         """
-        Count events in the specified time window.
+        Start of the 7, 14 and 30 day windows ending at the reference date.
         
         Args:
-            user_events: User's events DataFrame
-            reference_date: Reference date
-            window_days: Time window in days
+            reference_ts: Reference timestamp
             
         Returns:
-            Number of events in window
+            Tuple of cutoff timestamps (7d, 14d, 30d)
         """
-        cutoff_date = reference_date - timedelta(days=window_days)
-        recent_events = user_events[user_events['event_time'] >= cutoff_date]
-        return len(recent_events)
+        return tuple(
+            reference_ts - timedelta(days=window_days)
+            for window_days in (
+                self.config.window_7d, self.config.window_14d, self.config.window_30d
+            )
+        )
     
-    def _calculate_high_intent(
+    def _aggregate_features(
         self, 
-        user_events: pd.DataFrame, 
-        reference_date: datetime, 
-        window_days: int
-    ) -> int:
+        events: pd.DataFrame, 
+        reference_date: datetime
+    ) -> pd.DataFrame:
         """
-        Count high-intent events in the time window.
+        Calculate features for all users in one grouped pass over the events.
         
         Args:
-            user_events: User's events DataFrame
-            reference_date: Reference date
-            window_days: Time window in days
+            events: Events DataFrame with parsed event_time and category
+            reference_date: Reference date for calculations
             
         Returns:
-            Number of high-intent events
+            DataFrame with one row of features per anon_id, in order of
+            first appearance
         """
-        cutoff_date = reference_date - timedelta(days=window_days)
-        recent_events = user_events[user_events['event_time'] >= cutoff_date]
+        reference_ts = pd.Timestamp(reference_date)
+        event_time = events['event_time']
+        user_key = events['anon_id'].to_numpy()
+        
+        # Window masks, computed once for all users (on the raw array, no index)
+        in_7d, in_14d, in_30d = (
+            event_time.array >= cutoff for cutoff in self._window_cutoffs(reference_ts)
+        )
+        is_high_intent = events['event_name'].isin(self.config.high_intent_set).to_numpy()
+        
+        # Recency: days since last event
+        last_event = event_time.groupby(user_key, sort=False).max()
+        users = last_event.index
+        recency = ((reference_ts - last_event).dt.total_seconds() / 86400.0).clip(lower=0.0)
         
-        high_intent_count = recent_events[
-            recent_events['event_name'].isin(self.config.high_intent_events)
-        ].shape[0]
+        # Frequency and high intent counts
+        counts = pd.DataFrame({
+            'freq_7d': in_7d,
+            'freq_14d': in_14d,
+            'freq_30d': in_30d,
+            'high_intent_7d': in_7d & is_high_intent,
+        }).groupby(user_key, sort=False).sum()
         
-        return high_intent_count
+        # Category diversity
+        category_14d = events['category'][in_14d]
+        diversity = category_14d.groupby(user_key[in_14d], sort=False).nunique()
+        
+        # Reform bundles: user x bundle-category presence matrix from category codes
+        category_codes = self._bundle_category_codes(category_14d)
+        in_bundle = category_codes >= 0
+        user_index = users.get_indexer(user_key[in_14d][in_bundle])
+        presence = np.zeros((len(users), len(self._bundle_categories)), dtype=bool)
+        presence[user_index[user_index >= 0], category_codes[in_bundle][user_index >= 0]] = True
+        bundle_hit = np.zeros(len(users), dtype=bool)
+        for bundle_columns in self._bundle_columns:
+            bundle_hit |= presence[:, bundle_columns].all(axis=1)
+        bundle_hit = pd.Series(bundle_hit, index=users)
+        
+        # Cart abandonment
+        cart_abandon = self._calculate_cart_abandon(events[in_7d])
+        
+        features_df = pd.concat([
+            recency.rename('recency_days'),
+            counts,
+            diversity.reindex(users, fill_value=0).rename('category_diversity_14d'),
+            cart_abandon.reindex(users, fill_value=0).astype(int).rename('cart_abandon_7d'),
+            bundle_hit.astype(int).rename('reform_bundle_14d'),
+        ], axis=1)
+        features_df['anon_id'] = features_df.index
+        
+        return features_df.reset_index(drop=True)
     
-    def _calculate_category_diversity(
-        self, 
-        user_events: pd.DataFrame, 
-        reference_date: datetime, 
-        window_days: int
-    ) -> int:
+    def _bundle_category_codes(self, category: pd.Series) -> np.ndarray:
         """
-        Count distinct categories accessed in the time window.
+        Map categorical event categories to bundle-category positions.
         
         Args:
-            user_events: User's events DataFrame
-            reference_date: Reference date
-            window_days: Time window in days
+            category: Categorical Series of event categories
             
         Returns:
-            Number of distinct categories
+            Array with the lower-cased category's position in the bundle
+            categories, or -1 for missing and non-bundle categories
         """
-        cutoff_date = reference_date - timedelta(days=window_days)
-        recent_events = user_events[user_events['event_time'] >= cutoff_date]
+        category = category.astype('category')
+        lowered = pd.Index(category.cat.categories, dtype=object).str.lower()
+        code_map = np.append(self._bundle_categories.get_indexer(lowered), -1)
         
-        categories = recent_events['category'].dropna().unique()
-        return len(categories)
+        return code_map[category.cat.codes.to_numpy()]
     
-    def _calculate_cart_abandon(
-        self, 
-        user_events: pd.DataFrame, 
-        reference_date: datetime, 
-        window_days: int
-    ) -> int:
+    def _order_by_time(self, frame: pd.DataFrame) -> pd.DataFrame:
         """
-        Count cart abandonment instances (add_to_cart without begin_checkout).
+        Order rows by event_time ascending, skipping the sort when possible.
+        
+        Events usually arrive already ordered (ascending, or newest first as
+        in the sample data and daily extracts), so a monotonicity check
+        replaces the O(N log N) sort with at most a reversed view.
         
         Args:
-            user_events: User's events DataFrame
-            reference_date: Reference date
-            window_days: Time window in days
+            frame: DataFrame with an event_time column
             
         Returns:
-            Number of cart abandonments
+            DataFrame ordered by event_time
         """
-        cutoff_date = reference_date - timedelta(days=window_days)
-        recent_events = user_events[user_events['event_time'] >= cutoff_date]
-        
-        # Find add_to_cart events
-        cart_adds = recent_events[recent_events['event_name'] == 'add_to_cart']
-        
-        abandon_count = 0
-        abandon_window_hours = self.config.cart_abandon_hours
-        
-        for _, cart_add in cart_adds.iterrows():
-            add_time = cart_add['event_time']
-            checkout_window_end = add_time + timedelta(hours=abandon_window_hours)
-            
-            # Check if there's a begin_checkout in the next 24 hours
-            checkouts = recent_events[
-                (recent_events['event_name'] == 'begin_checkout') &
-                (recent_events['event_time'] >= add_time) &
-                (recent_events['event_time'] <= checkout_window_end)
-            ]
-            
-            if len(checkouts) == 0:
-                abandon_count += 1
-        
-        return abandon_count
+        event_time = frame['event_time']
+        if event_time.is_monotonic_increasing:
+            return frame
+        if event_time.is_monotonic_decreasing:
+            return frame.iloc[::-1]
+        return frame.sort_values('event_time', kind='stable')
     
-    def _calculate_reform_bundle(
-        self, 
-        user_events: pd.DataFrame, 
-        reference_date: datetime, 
-        window_days: int
-    ) -> int:
+    def _calculate_cart_abandon(self, recent_events: pd.DataFrame) -> pd.Series:
         """
-        Detect if user accessed typical reform product bundles.
+        Count cart abandonment instances (add_to_cart without begin_checkout).
+        
+        Each add_to_cart is matched to the next begin_checkout of the same
+        user with an as-of join; adds with no checkout within
+        cart_abandon_hours count as abandoned.
         
         Args:
-            user_events: User's events DataFrame
-            reference_date: Reference date
-            window_days: Time window in days
+            recent_events: Events DataFrame already limited to the time window
             
         Returns:
-            1 if bundle detected, 0 otherwise
+            Series mapping anon_id to number of cart abandonments (only users
+            with add_to_cart events are present)
         """
-        cutoff_date = reference_date - timedelta(days=window_days)
-        recent_events = user_events[user_events['event_time'] >= cutoff_date]
-        
-        # Get categories accessed
-        categories = set(recent_events['category'].dropna().str.lower())
-        
-        # Check for bundle patterns
-        for bundle in self.config.reform_bundles:
-            bundle_set = set(bundle)
-            if bundle_set.issubset(categories):
-                return 1
+        columns = ['anon_id', 'event_time']
+        cart_adds = self._order_by_time(
+            recent_events.loc[recent_events['event_name'] == 'add_to_cart', columns]
+        )
+        checkouts = self._order_by_time(
+            recent_events.loc[recent_events['event_name'] == 'begin_checkout', columns]
+        )
+        checkouts = checkouts.assign(checkout_time=checkouts['event_time'])
+        
+        matched = pd.merge_asof(
+            cart_adds,
+            checkouts,
+            on='event_time',
+            by='anon_id',
+            direction='forward',
+            tolerance=pd.Timedelta(hours=self.config.cart_abandon_hours)
+        )
         
-        return 0
+        abandoned = matched['checkout_time'].isna()
+        return abandoned.groupby(matched['anon_id'].to_numpy(), sort=False).sum()
@@ -3,28 +3,35 @@ Generate sample fake events data for demo and testing.
 """
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import json
-import random
+from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 
 def generate_sample_events(
     num_users: int = 100,
     days_back: int = 30,
-    output_path: Path = None
+    output_path: Path = None,
+    seed: Optional[int] = None
 ) -> pd.DataFrame:
     """
     Generate fake events data for demonstration.
     
+    Events are drawn column-wise with NumPy (one vectorized draw per
+    attribute for all users) instead of building one dict per event.
+    
     Args:
         num_users: Number of anonymous users
         days_back: Number of days of history to generate
-        output_path: Optional path to save CSV
+        output_path: Optional path to save the events (Parquet if the
+                     suffix is .parquet, CSV otherwise)
+        seed: Optional random seed for reproducible output
         
     Returns:
         DataFrame with sample events
     """
+    rng = np.random.default_rng(seed)
+    
     # Event types with probabilities
     event_types = [
         ("page_view", 0.30),
@@ -37,6 +44,10 @@ def generate_sample_events(
         ("begin_checkout", 0.05),
         ("search", 0.05)
     ]
+    high_intent_events = [
+        "submit_quote", "whatsapp_quote_request", 
+        "scan_qr_service", "talk_to_consultant", "begin_checkout"
+    ]
     
     # Product categories
     categories = [
@@ -45,103 +56,96 @@ def generate_sample_events(
         "janela", "persiana", "lampada", "tomada",
         "cimento", "areia", "ferramentas"
     ]
+    bundles = [
+        ["piso", "rodape"],
+        ["tinta", "massa", "lixa"],
+        ["azulejo", "rejunte"]
+    ]
+    search_terms = [
+        "piso laminado", "tinta parede", "azulejo banheiro",
+        "porta madeira", "janela aluminio", "reforma completa"
+    ]
     
     # Channels
     channels = ["web", "app", "store", "whatsapp"]
     
-    events = []
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days_back)
+    end_date = np.datetime64(datetime.now(), 'us')
     
-    # Generate users with different behavior patterns
-    for user_id in range(num_users):
-        anon_id = f"anon_{user_id:05d}"
-        
-        # Determine user engagement level
-        engagement = random.choice(["high", "medium", "low"])
-        
-        if engagement == "high":
-            num_events = random.randint(15, 50)
-            high_intent_prob = 0.3
-        elif engagement == "medium":
-            num_events = random.randint(5, 15)
-            high_intent_prob = 0.15
-        else:
-            num_events = random.randint(1, 5)
-            high_intent_prob = 0.05
-        
-        # Generate events for this user
-        for _ in range(num_events):
-            # Random timestamp
-            days_offset = random.uniform(0, days_back)
-            event_time = end_date - timedelta(days=days_offset)
-            
-            # Select event type
-            if random.random() < high_intent_prob:
-                # High intent event
-                high_intent_events = [
-                    "submit_quote", "whatsapp_quote_request", 
-                    "scan_qr_service", "talk_to_consultant", "begin_checkout"
-                ]
-                event_name = random.choice(high_intent_events)
-            else:
-                # Regular event based on probabilities
-                event_name = random.choices(
-                    [e[0] for e in event_types],
-                    weights=[e[1] for e in event_types]
-                )[0]
-            
-            # Channel
-            channel = random.choice(channels)
-            
-            # Event properties
-            event_props = {}
-            
-            # Add category for product-related events
-            if event_name in ["product_view", "add_to_cart", "submit_quote"]:
-                # Higher chance of bundle categories for engaged users
-                if engagement == "high" and random.random() < 0.4:
-                    # Generate bundle (e.g., piso + rodape)
-                    bundle_categories = random.choice([
-                        ["piso", "rodape"],
-                        ["tinta", "massa", "lixa"],
-                        ["azulejo", "rejunte"]
-                    ])
-                    event_props["category"] = random.choice(bundle_categories)
-                else:
-                    event_props["category"] = random.choice(categories)
-                
-                # Add value
-                event_props["value"] = round(random.uniform(50, 5000), 2)
-            
-            # Add search query for search events
-            if event_name == "search":
-                search_terms = [
-                    "piso laminado", "tinta parede", "azulejo banheiro",
-                    "porta madeira", "janela aluminio", "reforma completa"
-                ]
-                event_props["query"] = random.choice(search_terms)
-            
-            # Create event
-            event = {
-                "event_time": event_time.isoformat(),
-                "channel": channel,
-                "anon_id": anon_id,
-                "event_name": event_name,
-                "event_props": json.dumps(event_props),
-                "ingestion_time": event_time.isoformat()
-            }
-            
-            events.append(event)
-    
-    # Create DataFrame
-    df = pd.DataFrame(events)
-    df = df.sort_values("event_time", ascending=False)
-    
-    # Save to CSV if path provided
+    # User engagement level: 0 = high, 1 = medium, 2 = low
+    engagement = rng.integers(0, 3, num_users)
+    num_events = np.select(
+        [engagement == 0, engagement == 1],
+        [rng.integers(15, 51, num_users), rng.integers(5, 16, num_users)],
+        rng.integers(1, 6, num_users)
+    )
+    high_intent_prob = np.array([0.3, 0.15, 0.05])[engagement]
+    
+    # One row per event
+    n = int(num_events.sum())
+    anon_ids = np.array([f"anon_{user_id:05d}" for user_id in range(num_users)], dtype=object)
+    event_anon_id = np.repeat(anon_ids, num_events)
+    event_engagement = np.repeat(engagement, num_events)
+    
+    # Random timestamps
+    days_offset = rng.uniform(0, days_back, n)
+    event_time = end_date - (days_offset * 86400e6).astype('timedelta64[us]')
+    
+    # Event type: high intent with the user's probability, else weighted
+    weights = np.array([e[1] for e in event_types])
+    event_name = np.where(
+        rng.random(n) < np.repeat(high_intent_prob, num_events),
+        rng.choice(high_intent_events, n),
+        rng.choice([e[0] for e in event_types], n, p=weights / weights.sum())
+    ).astype(object)
+    
+    # Channel
+    channel = rng.choice(channels, n).astype(object)
+    
+    # Event properties as JSON strings (same format as json.dumps)
+    event_props = np.full(n, "{}", dtype=object)
+    
+    # Category and value for product-related events
+    is_product = np.isin(event_name, ["product_view", "add_to_cart", "submit_quote"])
+    n_product = int(is_product.sum())
+    category = rng.choice(categories, n_product).astype(object)
+    
+    # Higher chance of bundle categories for engaged users (e.g., piso + rodape)
+    bundle_idx = rng.integers(0, len(bundles), n_product)
+    bundle_sizes = np.array([len(b) for b in bundles])
+    bundle_pos = (rng.random(n_product) * bundle_sizes[bundle_idx]).astype(int)
+    bundle_table = np.array(
+        [b + [""] * (bundle_sizes.max() - len(b)) for b in bundles], dtype=object
+    )
+    use_bundle = (event_engagement[is_product] == 0) & (rng.random(n_product) < 0.4)
+    category[use_bundle] = bundle_table[bundle_idx, bundle_pos][use_bundle]
+    
+    value = np.round(rng.uniform(50, 5000, n_product), 2).astype(str).astype(object)
+    event_props[is_product] = '{"category": "' + category + '", "value": ' + value + '}'
+    
+    # Add search query for search events
+    is_search = event_name == "search"
+    query = rng.choice(search_terms, int(is_search.sum())).astype(object)
+    event_props[is_search] = '{"query": "' + query + '"}'
+    
+    # Create DataFrame, newest events first
+    order = np.argsort(event_time, kind='stable')[::-1]
+    event_time_iso = np.datetime_as_string(event_time[order], unit='us')
+    df = pd.DataFrame({
+        "event_time": event_time_iso,
+        "channel": channel[order],
+        "anon_id": event_anon_id[order],
+        "event_name": event_name[order],
+        "event_props": event_props[order],
+        "ingestion_time": event_time_iso
+    })
+    
+    # Save if path provided
     if output_path:
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        df.to_csv(output_path, index=False)
+        if output_path.suffix == ".parquet":
+            df.to_parquet(output_path, index=False, compression="zstd")
+        else:
+            df.to_csv(output_path, index=False)
         print(f"Generated {len(df)} sample events for {num_users} users")
         print(f"Saved to: {output_path}")
     
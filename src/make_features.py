@@ -7,22 +7,32 @@ import numpy as np
 from pathlib import Path
 from config import RAW_DATA_FILE, PROCESSED_DATA_FILE
 
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
 
 def load_raw_data(file_path=None):
     """
-    Carrega dados brutos do CSV.
+    Carrega dados brutos de Parquet ou CSV (pelo sufixo do arquivo).
     
     Args:
-        file_path: Caminho para o arquivo CSV (opcional)
+        file_path: Caminho para o arquivo .parquet ou .csv (opcional)
     
     Returns:
         DataFrame com os dados brutos
     """
     if file_path is None:
         file_path = RAW_DATA_FILE
+    file_path = Path(file_path)
     
     print(f"Carregando dados de: {file_path}")
-    df = pd.read_csv(file_path)
+    if file_path.suffix == '.parquet':
+        df = pd.read_parquet(file_path)
+    else:
+        df = pd.read_csv(file_path, engine='pyarrow')
     print(f"Dados carregados: {df.shape[0]} linhas, {df.shape[1]} colunas")
     return df
 
@@ -54,6 +64,45 @@ def clean_data(df):
     return df
 
 
+def clean_data_duckdb(file_path=None):
+    """
+    Carrega e limpa os dados brutos direto no DuckDB (sem DataFrame intermediário).
+    
+    Equivalente a load_raw_data + clean_data: remove duplicatas e linhas
+    com qualquer valor nulo, com deduplicação por hash em paralelo. Mantém
+    a primeira ocorrência de cada linha na ordem do arquivo, como o
+    drop_duplicates, para não alterar o split estratificado do treino.
+    
+    Args:
+        file_path: Caminho para o arquivo .parquet ou .csv (opcional)
+    
+    Returns:
+        DataFrame limpo
+    """
+    if file_path is None:
+        file_path = RAW_DATA_FILE
+    file_path = Path(file_path)
+    
+    reader = 'read_parquet' if file_path.suffix == '.parquet' else 'read_csv_auto'
+    
+    print(f"Carregando e limpando dados com DuckDB: {file_path}")
+    con = duckdb.connect()
+    try:
+        # A tabela temporária preserva a ordem do arquivo no rowid
+        con.execute(f"CREATE TEMP TABLE raw AS SELECT * FROM {reader}(?)", [str(file_path)])
+        df = con.execute(
+            "SELECT * EXCLUDE (first_rowid) FROM ("
+            " SELECT min(rowid) AS first_rowid, * FROM raw"
+            " WHERE COLUMNS(*) IS NOT NULL GROUP BY ALL"
+            ") ORDER BY first_rowid"
+        ).df()
+    finally:
+        con.close()
+    print(f"Linhas após limpeza: {len(df)}")
+    
+    return df
+
+
 def create_features(df):
     """
     Cria novas features a partir dos dados existentes.
@@ -76,17 +125,24 @@ def create_features(df):
 
 def save_processed_data(df, file_path=None):
     """
-    Salva dados processados em CSV.
+    Salva dados processados em Parquet (zstd) ou CSV, conforme o sufixo.
+    
+    Sem caminho, salva em Parquet ao lado de PROCESSED_DATA_FILE (mesmo nome,
+    sufixo .parquet), arquivo que o train.load_processed_data prefere.
     
     Args:
         df: DataFrame processado
         file_path: Caminho para salvar (opcional)
     """
     if file_path is None:
-        file_path = PROCESSED_DATA_FILE
+        file_path = Path(PROCESSED_DATA_FILE).with_suffix('.parquet')
+    file_path = Path(file_path)
     
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(file_path, index=False)
+    if file_path.suffix == '.parquet':
+        df.to_parquet(file_path, engine='pyarrow', compression='zstd', index=False)
+    else:
+        df.to_csv(file_path, index=False)
     print(f"Dados processados salvos em: {file_path}")
 
 
@@ -96,11 +152,12 @@ def main():
     """
     print("=== Iniciando processamento de features ===")
     
-    # Carregar dados
-    df = load_raw_data()
-    
-    # Limpar dados
-    df = clean_data(df)
+    # Carregar e limpar dados
+    if DUCKDB_AVAILABLE:
+        df = clean_data_duckdb()
+    else:
+        df = load_raw_data()
+        df = clean_data(df)
     
     # Criar features
     df = create_features(df)
@@ -2,15 +2,150 @@
 Módulo para fazer predições com modelo treinado.
 """
 
+import os
+import json
+from pathlib import Path
 import pandas as pd
 import numpy as np
 import joblib
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from contextlib import contextmanager
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from typing import Any, Dict, Iterator, Tuple
 from config import MODEL_FILE
 
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+
+# Modelos já carregados, por (caminho, mtime): um modelo re-treinado no
+# mesmo caminho é recarregado
+_MODEL_CACHE: Dict[Tuple[str, float], Any] = {}
+
+# Elementos (linhas x features) por bloco de predict_proba, para o bloco
+# caber no cache L3
+PREDICT_CHUNK_ELEMENTS = 2_000_000
+
+# Buffer de escrita do CSV: agrupa as escritas pequenas de cada lote do
+# writer do Arrow em blocos de 1 MiB
+CSV_WRITE_BUFFER_BYTES = 1 << 20
+
+# Modelos de árvore do sklearn: comparam as features em float32 internamente
+FLOAT32_TREE_MODELS = (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)
+
+
+class OnnxModel:
+    """
+    Modelo exportado para ONNX (train.export_onnx), executado pelo onnxruntime.
+    
+    Expõe classes_, feature_names_in_, predict e predict_proba como o
+    estimador do sklearn.
+    """
+    
+    def __init__(self, onnx_path):
+        """
+        Args:
+            onnx_path: Caminho do arquivo .onnx
+        
+        Raises:
+            ValueError: Se a exportação não tem os nomes das features nos
+                        metadados (exportada por uma versão anterior)
+        """
+        self.session = ort.InferenceSession(
+            str(onnx_path), providers=['CPUExecutionProvider']
+        )
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if 'feature_names' not in metadata:
+            raise ValueError(f"Exportação ONNX sem nomes de features: {onnx_path}")
+        
+        self.classes_ = np.array(json.loads(metadata['classes']))
+        self.feature_names_in_ = json.loads(metadata['feature_names'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.n_features_in_ = self.session.get_inputs()[0].shape[1]
+    
+    def _ordered_features(self, X):
+        """
+        Colunas de um DataFrame na ordem do treino (o ONNX lê por posição).
+        
+        Args:
+            X: Features (DataFrame ou array)
+        
+        Returns:
+            X com as colunas reordenadas (arrays ficam inalterados)
+        
+        Raises:
+            ValueError: Se os nomes das colunas não são os do treino
+        """
+        if self.feature_names_in_ is None or not hasattr(X, 'columns'):
+            return X
+        
+        columns = list(X.columns)
+        if columns == self.feature_names_in_:
+            return X
+        if sorted(map(str, columns)) != sorted(self.feature_names_in_):
+            raise ValueError(
+                f"Os nomes das features não correspondem aos do treino: "
+                f"esperado {self.feature_names_in_}, recebido {columns}"
+            )
+        return X[self.feature_names_in_]
+    
+    def predict_proba(self, X):
+        """
+        Probabilidades por classe, na ordem de classes_.
+        
+        Args:
+            X: Features (DataFrame ou array), convertidas para float32
+        
+        Returns:
+            Array (n_amostras, n_classes) com probabilidades
+        """
+        X = np.asarray(self._ordered_features(X), dtype=np.float32)
+        # Saídas do conversor: [rótulos, probabilidades]
+        return self.session.run(None, {self.input_name: X})[1]
+    
+    def predict(self, X):
+        """
+        Classe predita (argmax das probabilidades).
+        
+        Args:
+            X: Features (DataFrame ou array)
+        
+        Returns:
+            Array com predições
+        """
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _onnx_path(file_path):
+    """
+    Arquivo .onnx exportado junto do modelo, se existir e estiver atualizado.
+    
+    Args:
+        file_path: Caminho para o arquivo do modelo (joblib)
+    
+    Returns:
+        Caminho do .onnx ou None
+    """
+    if not ONNXRUNTIME_AVAILABLE:
+        return None
+    
+    onnx_path = Path(file_path).with_suffix('.onnx')
+    if onnx_path.exists() and os.path.getmtime(onnx_path) >= os.path.getmtime(file_path):
+        return onnx_path
+    return None
+
 
 def load_model(file_path=None):
     """
-    Carrega modelo treinado.
+    Carrega modelo treinado (reutiliza o cache se o arquivo não mudou).
+    
+    Se houver uma exportação ONNX atualizada do modelo e o onnxruntime
+    estiver instalado, retorna um OnnxModel em vez do estimador do sklearn.
     
     Args:
         file_path: Caminho para o arquivo do modelo (opcional)
@@ -21,46 +156,135 @@ def load_model(file_path=None):
     if file_path is None:
         file_path = MODEL_FILE
     
-    print(f"Carregando modelo de: {file_path}")
-    model = joblib.load(file_path)
+    onnx_path = _onnx_path(file_path)
+    source_path = onnx_path if onnx_path is not None else file_path
+    
+    cache_key = (str(file_path), os.path.getmtime(source_path))
+    if cache_key in _MODEL_CACHE:
+        return _MODEL_CACHE[cache_key]
+    
+    print(f"Carregando modelo de: {source_path}")
+    model = None
+    if onnx_path is not None:
+        try:
+            model = OnnxModel(onnx_path)
+        except ValueError as e:
+            print(f"{e}; usando o modelo joblib")
+    
+    if model is None:
+        model = joblib.load(file_path)
+    
+    # Descarta versões anteriores do mesmo arquivo
+    for stale_key in [key for key in _MODEL_CACHE if key[0] == cache_key[0]]:
+        del _MODEL_CACHE[stale_key]
+    _MODEL_CACHE[cache_key] = model
     return model
 
 
+@contextmanager
+def cached_predict(file_path=None) -> Iterator[Any]:
+    """
+    Contexto com o modelo residente em memória (carregado uma única vez).
+    
+    Args:
+        file_path: Caminho para o arquivo do modelo (opcional)
+    
+    Yields:
+        Modelo carregado (do cache, se já carregado antes)
+    """
+    yield load_model(file_path)
+
+
 def load_data_for_prediction(file_path):
     """
-    Carrega dados para predição.
+    Carrega dados para predição de Parquet ou CSV (pelo sufixo do arquivo).
     
     Args:
-        file_path: Caminho para arquivo CSV com dados
+        file_path: Caminho para arquivo .parquet ou .csv com dados
     
     Returns:
         DataFrame com os dados
     """
     print(f"Carregando dados de: {file_path}")
-    df = pd.read_csv(file_path)
+    if Path(file_path).suffix == '.parquet':
+        df = pd.read_parquet(file_path)
+    else:
+        df = pd.read_csv(file_path, engine='pyarrow')
     print(f"Dados carregados: {df.shape[0]} linhas, {df.shape[1]} colunas")
     return df
 
 
-def make_predictions(model, X):
+def _predict_proba_chunked(model, X):
+    """
+    predict_proba em blocos de linhas, para limitar o working set por bloco.
+    
+    Args:
+        model: Modelo treinado com predict_proba
+        X: Features para predição (DataFrame ou array)
+    
+    Returns:
+        Array (n_amostras, n_classes) com probabilidades
+    """
+    chunk_size = max(1024, PREDICT_CHUNK_ELEMENTS // max(1, X.shape[1]))
+    if len(X) <= chunk_size:
+        return model.predict_proba(X)
+    
+    rows = X.iloc if hasattr(X, 'iloc') else X
+    probabilities = np.empty((len(X), len(model.classes_)))
+    for start in range(0, len(X), chunk_size):
+        probabilities[start:start + chunk_size] = model.predict_proba(
+            rows[start:start + chunk_size]
+        )
+    
+    return probabilities
+
+
+def _as_float32(model, X):
+    """
+    Converte as features para float32 uma única vez, para modelos de árvore.
+    
+    As árvores do sklearn (e o modelo ONNX) comparam os limiares em float32,
+    então o resultado é idêntico; evita que cada chamada/bloco de predict_proba
+    faça sua própria cópia float64 -> float32.
+    
+    Args:
+        model: Modelo treinado
+        X: Features para predição (DataFrame ou array)
+    
+    Returns:
+        Features em float32 (DataFrame mantém os nomes das colunas), ou X
+        inalterado para outros modelos
+    """
+    if not isinstance(model, FLOAT32_TREE_MODELS + (OnnxModel,)):
+        return X
+    if hasattr(X, 'astype') and hasattr(X, 'columns'):
+        return X.astype(np.float32)
+    return np.asarray(X, dtype=np.float32)
+
+
+def make_predictions(model, X, want_proba=True):
     """
     Faz predições com o modelo.
     
     Args:
         model: Modelo treinado
         X: Features para predição (DataFrame ou array)
+        want_proba: Se False, não calcula nem retorna probabilidades
     
     Returns:
-        Array com predições
+        Array com predições e array com probabilidades (ou None)
     """
     print("Fazendo predições...")
-    predictions = model.predict(X)
+    X = _as_float32(model, X)
     
-    # Se o modelo suporta probabilidades
-    if hasattr(model, 'predict_proba'):
-        probabilities = model.predict_proba(X)
+    # Se o modelo suporta probabilidades, predict = argmax de predict_proba
+    # (uma única passada de inferência em vez de duas)
+    if want_proba and hasattr(model, 'predict_proba'):
+        probabilities = _predict_proba_chunked(model, X)
+        predictions = model.classes_[np.argmax(probabilities, axis=1)]
         return predictions, probabilities
     
+    predictions = model.predict(X)
     return predictions, None
 
 
@@ -81,30 +305,35 @@ def save_predictions(predictions, probabilities=None, output_file='predictions.c
         for i in range(probabilities.shape[1]):
             result_df[f'prob_class_{i}'] = probabilities[:, i]
     
-    result_df.to_csv(output_file, index=False)
+    # Escrita pelo writer CSV em C++ do Arrow (mais rápido que DataFrame.to_csv),
+    # por um stream com buffer descarregado uma única vez ao fechar
+    table = pa.Table.from_pandas(result_df, preserve_index=False)
+    with pa.output_stream(str(output_file), buffer_size=CSV_WRITE_BUFFER_BYTES) as sink:
+        pa_csv.write_csv(table, sink)
     print(f"Predições salvas em: {output_file}")
 
 
-def predict_single(model, features):
+def predict_single(model, features, want_proba=True):
     """
     Faz predição para uma única amostra.
     
     Args:
         model: Modelo treinado
         features: Lista ou array com features
+        want_proba: Se False, não calcula nem retorna a probabilidade
     
     Returns:
-        Predição e probabilidade (se disponível)
+        Predição e probabilidade (se disponível e solicitada)
     """
     # Converter para formato esperado pelo modelo
     X = np.array(features).reshape(1, -1)
     
-    prediction = model.predict(X)[0]
-    
-    if hasattr(model, 'predict_proba'):
+    if want_proba and hasattr(model, 'predict_proba'):
         probability = model.predict_proba(X)[0]
+        prediction = model.classes_[np.argmax(probability)]
         return prediction, probability
     
+    prediction = model.predict(X)[0]
     return prediction, None
 
 
@@ -4,10 +4,14 @@ Reads events from BigQuery (or local CSV), calculates features and scores,
 and writes results back to BigQuery (or local CSV).
 """
 import argparse
+import hashlib
 from datetime import datetime, timedelta
 from pathlib import Path
 import sys
 
+import numpy as np
+import pandas as pd
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -15,22 +19,60 @@ from src.config import (
     validate_bq_config,
     get_sample_events_path,
     ensure_directories,
-    DATA_DIR
+    DATA_DIR,
+    CACHE_DIR,
+    FEATURE_CONFIG,
+    SCORING_CONFIG
 )
+from src.event_schema import CLASS_LABELS
 from src.features import FeatureEngineer
 from src.scoring import ReadyToReformScorer
 from src.bq_io import (
     BigQueryIO, 
     load_events_from_csv, 
     save_scores_to_csv,
+    save_scores_to_parquet,
+    load_scores_from_parquet,
     BIGQUERY_AVAILABLE
 )
 
 
+# Position of each class label in the distribution histogram
+LABEL_TO_ID = {label: i for i, label in enumerate(CLASS_LABELS)}
+
+
+def scores_cache_path(events_df: pd.DataFrame, reference_date: datetime) -> Path:
+    """
+    Path of the cached scores for these events and reference date.
+    
+    The key hashes the event rows, the reference date and the feature and
+    scoring configs, so any change to them misses the cache. Row hashes are
+    sorted first: BigQuery returns events in no fixed order, and the same
+    events in another order give the same scores.
+    
+    Args:
+        events_df: Events DataFrame
+        reference_date: Reference date used for features and scores
+        
+    Returns:
+        Path to the Parquet file under CACHE_DIR
+    """
+    digest = hashlib.blake2b(
+        np.sort(pd.util.hash_pandas_object(events_df, index=False).to_numpy()).tobytes(),
+        digest_size=16
+    )
+    digest.update(reference_date.isoformat().encode())
+    digest.update(repr((FEATURE_CONFIG, SCORING_CONFIG)).encode())
+    
+    return CACHE_DIR / f"scores_{digest.hexdigest()}.parquet"
+
+
 def run_scoring_job(
     use_local_sample: bool = False,
     lookback_days: int = 30,
-    output_csv: Path = None
+    output_csv: Path = None,
+    reference_date: datetime = None,
+    n_jobs: int = 1
 ) -> None:
     """
     Run the daily scoring job.
@@ -39,6 +81,12 @@ def run_scoring_job(
         use_local_sample: If True, use local CSV instead of BigQuery
         lookback_days: Number of days to look back for events
         output_csv: Optional path to save scores as CSV
+        reference_date: Reference date for features and scores (default: now).
+                        When given, scores are cached by events hash and
+                        reference date, so reruns on the same events skip
+                        feature and score calculation
+        n_jobs: Number of worker processes for feature calculation (users are
+                split into n_jobs partitions); -1 uses all cores
     """
     print("=" * 60)
     print("Ready-to-Reform Daily Scoring Job")
@@ -46,6 +94,8 @@ def run_scoring_job(
     print(f"Started at: {datetime.now().isoformat()}")
     print(f"Mode: {'Local Sample' if use_local_sample else 'BigQuery'}")
     print(f"Lookback days: {lookback_days}")
+    if reference_date is not None:
+        print(f"Reference date: {reference_date.isoformat()}")
     print()
     
     # Ensure directories exist
@@ -81,7 +131,7 @@ def run_scoring_job(
             sys.exit(1)
         
         # Load events
-        end_date = datetime.now()
+        end_date = reference_date or datetime.now()
         start_date = end_date - timedelta(days=lookback_days)
         
         events_df = bq.read_events(start_date, end_date)
@@ -95,52 +145,78 @@ def run_scoring_job(
     print(f"  - Date range: {events_df['event_time'].min()} to {events_df['event_time'].max()}")
     print()
     
-    # Step 2: Calculate features
-    print("Step 2: Calculating features...")
+    cache_path = None
+    if reference_date is not None:
+        cache_path = scores_cache_path(events_df, reference_date)
     
-    engineer = FeatureEngineer()
-    features_df = engineer.calculate_features(events_df)
-    
-    print(f"✓ Calculated features for {len(features_df)} users")
-    print(f"  - Features: {list(features_df.columns)}")
-    print()
-    
-    # Step 3: Calculate scores
-    print("Step 3: Calculating scores...")
-    
-    scorer = ReadyToReformScorer()
-    scores = scorer.calculate_scores(features_df)
-    
-    print(f"✓ Calculated {len(scores)} scores")
+    if cache_path is not None and cache_path.exists():
+        # Steps 2-3: same events and reference date as a previous run
+        print("Steps 2-3: Loading cached scores...")
+        
+        scores = load_scores_from_parquet(cache_path)
+        
+        print(f"✓ Loaded {len(scores)} scores from {cache_path}")
+    else:
+        # Step 2: Calculate features
+        print("Step 2: Calculating features...")
+        
+        engineer = FeatureEngineer(n_jobs=n_jobs)
+        features_df = engineer.calculate_features(events_df, reference_date)
+        
+        print(f"✓ Calculated features for {len(features_df)} users")
+        print(f"  - Features: {list(features_df.columns)}")
+        print()
+        
+        # Step 3: Calculate scores
+        print("Step 3: Calculating scores...")
+        
+        scorer = ReadyToReformScorer()
+        scores = scorer.calculate_scores(features_df, reference_date)
+        
+        print(f"✓ Calculated {len(scores)} scores")
+        
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            save_scores_to_parquet(scores, cache_path)
     
-    # Score distribution
-    class_counts = {}
-    for score in scores:
-        class_counts[score.class_label] = class_counts.get(score.class_label, 0) + 1
+    # Score distribution (label ids in CLASS_LABELS order, which is alphabetical)
+    label_ids = np.fromiter(
+        (LABEL_TO_ID[score.class_label] for score in scores), dtype=np.int8, count=len(scores)
+    )
+    class_counts = np.bincount(label_ids, minlength=len(CLASS_LABELS))
     
     print(f"  - Distribution:")
-    for class_label, count in sorted(class_counts.items()):
+    for class_label, count in zip(CLASS_LABELS, class_counts.tolist()):
+        if count == 0:
+            continue
         percentage = (count / len(scores)) * 100
         print(f"    • {class_label}: {count} ({percentage:.1f}%)")
     
-    # Top scores
-    sorted_scores = sorted(scores, key=lambda x: x.score, reverse=True)
+    # Top scores: partial selection instead of sorting every Score object.
+    # Ties at the cut-off are kept, then a stable sort picks the earliest
+    # ones, matching sorted(..., reverse=True)[:5]
+    score_array = np.fromiter((score.score for score in scores), dtype=np.float64, count=len(scores))
+    top_n = min(5, len(scores))
+    cutoff = np.partition(score_array, len(scores) - top_n)[len(scores) - top_n]
+    top_idx = np.flatnonzero(score_array >= cutoff)
+    top_idx = top_idx[np.argsort(-score_array[top_idx], kind='stable')][:top_n]
+    
     print(f"  - Top 5 scores:")
-    for i, score in enumerate(sorted_scores[:5], 1):
+    for i, idx in enumerate(top_idx.tolist(), 1):
+        score = scores[idx]
         print(f"    {i}. {score.anon_id}: {score.score:.2f} ({score.class_label})")
     print()
     
     # Step 4: Save scores
     print("Step 4: Saving scores...")
     
-    if use_local_sample or output_csv:
+    if output_csv:
         # Save to CSV
-        if output_csv:
-            csv_path = output_csv
-        else:
-            csv_path = DATA_DIR / "processed" / f"scores_{datetime.now().strftime('%Y%m%d')}.csv"
-        
-        save_scores_to_csv(scores, csv_path)
+        save_scores_to_csv(scores, output_csv)
+    elif use_local_sample:
+        # Save to Parquet (top_drivers stored as structured records)
+        parquet_path = DATA_DIR / "processed" / f"scores_{datetime.now().strftime('%Y%m%d')}.parquet"
+        save_scores_to_parquet(scores, parquet_path)
     else:
         # Save to BigQuery
         bq.write_scores(scores)
@@ -176,6 +252,20 @@ def main():
         help="Optional path to save scores as CSV"
     )
     
+    parser.add_argument(
+        "--reference_date",
+        type=datetime.fromisoformat,
+        help="Reference date (ISO format) for features and scores; "
+             "scores for the same events and date are reused from cache"
+    )
+    
+    parser.add_argument(
+        "--n_jobs",
+        type=int,
+        default=1,
+        help="Worker processes for feature calculation, -1 for all cores (default: 1)"
+    )
+    
     args = parser.parse_args()
     
     output_csv = Path(args.output_csv) if args.output_csv else None
@@ -184,7 +274,9 @@ def main():
         run_scoring_job(
             use_local_sample=args.local_sample,
             lookback_days=args.lookback_days,
-            output_csv=output_csv
+            output_csv=output_csv,
+            reference_date=args.reference_date,
+            n_jobs=args.n_jobs
         )
     except Exception as e:
         print(f"\n✗ ERROR: {e}", file=sys.stderr)
@@ -2,13 +2,151 @@
 Scoring module for the Ready-to-Reform score.
 Calculates a 0-100 score indicating how ready a user is for a reform.
 """
+import threading
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple, List
+from typing import List
 from datetime import datetime
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """No-op replacement for numba.njit when numba is not installed."""
+        def decorator(func):
+            return func
+        return decorator
+
 from .config import SCORING_CONFIG
-from .event_schema import Score
+from .event_schema import Score, json_dumps
+
+
+# Feature columns used by the score kernel, with the default for missing columns
+SCORE_FEATURES = (
+    ('recency_days', 999.0),
+    ('high_intent_7d', 0.0),
+    ('freq_7d', 0.0),
+    ('freq_14d', 0.0),
+    ('freq_30d', 0.0),
+    ('category_diversity_14d', 0.0),
+    ('reform_bundle_14d', 0.0),
+    ('cart_abandon_7d', 0.0),
+)
+
+# Score components, in the column order returned by the score kernel
+COMPONENT_NAMES = ('recency', 'high_intent', 'frequency', 'diversity', 'bundles_abandon')
+
+# Minimum number of users before scoring rows in parallel threads
+PARALLEL_MIN_USERS = 10_000
+
+
+def _score_rows(X, weights, max_score):
+    """
+    Calculate the weighted score components for all users.
+    
+    Args:
+        X: float64 array (n_users, 8) with the SCORE_FEATURES columns
+        weights: float64 array with the 5 component weights
+        max_score: Maximum score
+        
+    Returns:
+        Tuple of (components (n_users, 5), total scores (n_users,))
+    """
+    n = X.shape[0]
+    components = np.empty((n, 5))
+    totals = np.empty(n)
+    
+    for i in prange(n):
+        # 1. Recency: linear decay from 100 at day 1 to 0 at day 30
+        recency_days = X[i, 0]
+        if recency_days >= 30:
+            recency_score = 0.0
+        elif recency_days <= 1:
+            recency_score = 100.0
+        else:
+            recency_score = 100 * (1 - (recency_days - 1) / 29)
+        
+        # 2. High intent: each event worth 25 pts, capped at 100
+        high_intent_score = min(100.0, X[i, 1] * 25)
+        
+        # 3. Frequency: weighted average 50% 7d, 30% 14d, 20% 30d, 5 pts each
+        weighted_freq = 0.5 * X[i, 2] + 0.3 * X[i, 3] + 0.2 * X[i, 4]
+        freq_score = min(100.0, weighted_freq * 5)
+        
+        # 4. Category diversity: each category worth 20 pts
+        diversity_score = min(100.0, X[i, 5] * 20)
+        
+        # 5. Bundles/abandonment: bundle is a strong signal, abandons add some
+        bundle_score = 0.0
+        if X[i, 6] > 0:
+            bundle_score += 70
+        if X[i, 7] > 0:
+            bundle_score += min(30.0, X[i, 7] * 15)
+        bundle_score = min(100.0, bundle_score)
+        
+        components[i, 0] = recency_score * weights[0]
+        components[i, 1] = high_intent_score * weights[1]
+        components[i, 2] = freq_score * weights[2]
+        components[i, 3] = diversity_score * weights[3]
+        components[i, 4] = bundle_score * weights[4]
+        
+        total = (components[i, 0] + components[i, 1] + components[i, 2]
+                 + components[i, 3] + components[i, 4])
+        totals[i] = min(max_score, max(0.0, total))
+    
+    return components, totals
+
+
+def _score_columns(X, weights, max_score):
+    """
+    Calculate the weighted score components with NumPy column operations.
+    
+    Same arithmetic (and operation order) as _score_rows; used when numba is
+    not installed, where the row loop would run in the interpreter.
+    
+    Args:
+        X: float64 array (n_users, 8) with the SCORE_FEATURES columns
+        weights: float64 array with the 5 component weights
+        max_score: Maximum score
+        
+    Returns:
+        Tuple of (components (n_users, 5), total scores (n_users,))
+    """
+    recency_days = X[:, 0]
+    recency_score = np.where(
+        recency_days >= 30, 0.0,
+        np.where(recency_days <= 1, 100.0, 100 * (1 - (recency_days - 1) / 29))
+    )
+    high_intent_score = np.minimum(100.0, X[:, 1] * 25)
+    weighted_freq = 0.5 * X[:, 2] + 0.3 * X[:, 3] + 0.2 * X[:, 4]
+    freq_score = np.minimum(100.0, weighted_freq * 5)
+    diversity_score = np.minimum(100.0, X[:, 5] * 20)
+    bundle_score = np.minimum(100.0, (
+        np.where(X[:, 6] > 0, 70.0, 0.0)
+        + np.where(X[:, 7] > 0, np.minimum(30.0, X[:, 7] * 15), 0.0)
+    ))
+    
+    components = np.column_stack([
+        recency_score, high_intent_score, freq_score, diversity_score, bundle_score
+    ]) * weights
+    
+    total = (components[:, 0] + components[:, 1] + components[:, 2]
+             + components[:, 3] + components[:, 4])
+    totals = np.minimum(max_score, np.maximum(0.0, total))
+    
+    return components, totals
+
+
+# Only the serial build is cached on disk: numba keys the cache index by the
+# Python function, so caching both builds of _score_rows lets the serial kernel
+# load the parallel one. The parallel build compiles once per process and is
+# only used for large batches.
+_score_kernel = njit(cache=True)(_score_rows)
+_score_kernel_parallel = njit(parallel=True)(_score_rows)
 
 
 class ReadyToReformScorer:
@@ -22,6 +160,13 @@ class ReadyToReformScorer:
             config: ScoringConfig instance with scoring parameters
         """
         self.config = config
+        self.weights = np.array([
+            config.weight_recency,
+            config.weight_high_intent,
+            config.weight_frequency,
+            config.weight_diversity,
+            config.weight_bundles
+        ], dtype=np.float64)
     
     def calculate_scores(
         self, 
@@ -41,93 +186,64 @@ class ReadyToReformScorer:
         if score_date is None:
             score_date = datetime.now()
         
+        if len(features) == 0:
+            return []
+        
+        # Numba's thread pool is only started from the main thread: the TBB
+        # layer can hang at interpreter exit when first used from a worker thread
+        if not NUMBA_AVAILABLE:
+            kernel = _score_columns
+        elif len(features) >= PARALLEL_MIN_USERS and threading.current_thread() is threading.main_thread():
+            kernel = _score_kernel_parallel
+        else:
+            kernel = _score_kernel
+        
+        components, totals = kernel(
+            self._feature_matrix(features), self.weights, float(self.config.max_score)
+        )
+        top_idx = self._get_top_drivers(components)
+        
+        # Plain Python lists: row access without boxing NumPy scalars
         scores = []
         
-        for _, row in features.iterrows():
-            score_value, components = self._calculate_user_score(row)
-            class_label = self._classify_score(score_value)
-            top_drivers = self._get_top_drivers(components)
+        for anon_id, total, row, top in zip(
+            features['anon_id'].tolist(),
+            totals.tolist(),
+            components.tolist(),
+            top_idx.tolist()
+        ):
+            score_value = round(total, 2)
             
             score = Score(
-                anon_id=row['anon_id'],
+                anon_id=anon_id,
                 score=score_value,
-                class_label=class_label,
+                class_label=self._classify_score(score_value),
                 score_date=score_date,
-                top_drivers=top_drivers
+                top_drivers={COMPONENT_NAMES[j]: round(row[j], 2) for j in top}
             )
             scores.append(score)
         
         return scores
     
-    def _calculate_user_score(
-        self, 
-        features: pd.Series
-    ) -> Tuple[float, Dict[str, float]]:
+    def _feature_matrix(self, features: pd.DataFrame) -> np.ndarray:
         """
-        Calculate score for a single user.
+        Build the contiguous float64 input matrix for the score kernel.
         
         Args:
-            features: Series with user features
+            features: DataFrame with features for each anon_id
             
         Returns:
-            Tuple of (total_score, component_scores)
+            Array of shape (n_users, len(SCORE_FEATURES))
         """
-        components = {}
+        X = np.empty((len(features), len(SCORE_FEATURES)), dtype=np.float64)
         
-        # 1. Recency component (30%)
-        # Lower recency is better, scale to 0-100
-        recency_days = features.get('recency_days', 999)
-        if recency_days >= 30:
-            recency_score = 0
-        elif recency_days <= 1:
-            recency_score = 100
-        else:
-            # Linear decay from 100 at day 1 to 0 at day 30
-            recency_score = 100 * (1 - (recency_days - 1) / 29)
-        components['recency'] = recency_score * self.config.weight_recency
-        
-        # 2. High intent component (25%)
-        # More high intent events = higher score
-        high_intent = features.get('high_intent_7d', 0)
-        high_intent_score = min(100, high_intent * 25)  # Cap at 100, each event worth 25 pts
-        components['high_intent'] = high_intent_score * self.config.weight_high_intent
-        
-        # 3. Frequency component (20%)
-        # Combine frequencies with more weight on recent
-        freq_7d = features.get('freq_7d', 0)
-        freq_14d = features.get('freq_14d', 0)
-        freq_30d = features.get('freq_30d', 0)
-        
-        # Weighted average: 50% 7d, 30% 14d, 20% 30d
-        weighted_freq = (0.5 * freq_7d + 0.3 * freq_14d + 0.2 * freq_30d)
-        freq_score = min(100, weighted_freq * 5)  # Each weighted event worth 5 pts
-        components['frequency'] = freq_score * self.config.weight_frequency
-        
-        # 4. Category diversity component (15%)
-        # More categories = more engagement
-        diversity = features.get('category_diversity_14d', 0)
-        diversity_score = min(100, diversity * 20)  # Each category worth 20 pts
-        components['diversity'] = diversity_score * self.config.weight_diversity
-        
-        # 5. Bundles/Abandonment component (10%)
-        # Reform bundle is very positive, cart abandon is slightly positive (shows interest)
-        reform_bundle = features.get('reform_bundle_14d', 0)
-        cart_abandon = features.get('cart_abandon_7d', 0)
-        
-        bundle_score = 0
-        if reform_bundle > 0:
-            bundle_score += 70  # Bundle is strong signal
-        if cart_abandon > 0:
-            bundle_score += min(30, cart_abandon * 15)  # Each abandon adds some signal
-        
-        bundle_score = min(100, bundle_score)
-        components['bundles_abandon'] = bundle_score * self.config.weight_bundles
-        
-        # Total score
-        total_score = sum(components.values())
-        total_score = min(self.config.max_score, max(0, total_score))
-        
-        return round(total_score, 2), components
+        for j, (column, default) in enumerate(SCORE_FEATURES):
+            if column in features.columns:
+                X[:, j] = features[column].to_numpy(dtype=np.float64, na_value=default)
+            else:
+                X[:, j] = default
+        
+        return X
     
     def _classify_score(self, score: float) -> str:
         """
@@ -148,33 +264,21 @@ class ReadyToReformScorer:
     
     def _get_top_drivers(
         self, 
-        components: Dict[str, float],
+        components: np.ndarray,
         top_n: int = 3
-    ) -> Dict[str, float]:
+    ) -> np.ndarray:
         """
-        Get the top N score drivers.
+        Get the top N score drivers for every user.
         
         Args:
-            components: Dictionary of score components
+            components: Array (n_users, 5) of score components
             top_n: Number of top drivers to return
             
         Returns:
-            Dictionary with top N drivers and their contributions
+            Array (n_users, top_n) of component indices, largest first
         """
-        # Sort components by value
-        sorted_components = sorted(
-            components.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )
-        
-        # Take top N
-        top_drivers = dict(sorted_components[:top_n])
-        
-        # Round values
-        top_drivers = {k: round(v, 2) for k, v in top_drivers.items()}
-        
-        return top_drivers
+        # Stable sort keeps ties in COMPONENT_NAMES order
+        return np.argsort(-components, axis=1, kind='stable')[:, :top_n]
     
     def scores_to_dataframe(self, scores: List[Score]) -> pd.DataFrame:
         """
@@ -186,4 +290,22 @@ class ReadyToReformScorer:
         Returns:
             DataFrame with score data
         """
-        return pd.DataFrame([s.to_dict() for s in scores])
+        # Column lists instead of one dict per score (same values as Score.to_dict)
+        anon_ids, score_values, class_labels, score_dates, top_drivers = [], [], [], [], []
+        
+        for s in scores:
+            anon_ids.append(s.anon_id)
+            score_values.append(s.score)
+            class_labels.append(s.class_label)
+            score_dates.append(
+                s.score_date.date().isoformat() if isinstance(s.score_date, datetime) else s.score_date
+            )
+            top_drivers.append(json_dumps(s.top_drivers))
+        
+        return pd.DataFrame({
+            'anon_id': anon_ids,
+            'score': score_values,
+            'class_label': class_labels,
+            'score_date': score_dates,
+            'top_drivers': top_drivers
+        })
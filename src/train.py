@@ -2,6 +2,10 @@
 Módulo para treinamento de modelos de machine learning.
 """
 
+import hashlib
+import json
+import os
+from pathlib import Path
 import pandas as pd
 import numpy as np
 import joblib
@@ -10,10 +14,38 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from config import PROCESSED_DATA_FILE, MODEL_FILE, RANDOM_STATE, TEST_SIZE, MODEL_PARAMS
 
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    SKL2ONNX_AVAILABLE = True
+except ImportError:
+    SKL2ONNX_AVAILABLE = False
+
+
+def _parquet_sibling(file_path):
+    """
+    Versão Parquet do arquivo (mesmo nome, sufixo .parquet), se for a mais recente.
+    
+    Args:
+        file_path: Caminho para o arquivo processado
+    
+    Returns:
+        Caminho do .parquet, ou file_path se não houver um atualizado
+    """
+    parquet_path = file_path.with_suffix('.parquet')
+    if parquet_path.exists() and (
+        not file_path.exists() or os.path.getmtime(parquet_path) >= os.path.getmtime(file_path)
+    ):
+        return parquet_path
+    return file_path
+
 
 def load_processed_data(file_path=None):
     """
-    Carrega dados processados.
+    Carrega dados processados de Parquet ou CSV.
+    
+    Um .parquet ao lado do arquivo (ver make_features.save_processed_data)
+    é lido no lugar do CSV: colunas já tipadas, sem parse de texto.
     
     Args:
         file_path: Caminho para o arquivo processado (opcional)
@@ -23,13 +55,49 @@ def load_processed_data(file_path=None):
     """
     if file_path is None:
         file_path = PROCESSED_DATA_FILE
+    file_path = _parquet_sibling(Path(file_path))
     
     print(f"Carregando dados processados de: {file_path}")
-    df = pd.read_csv(file_path)
+    if file_path.suffix == '.parquet':
+        df = pd.read_parquet(file_path)
+    else:
+        df = pd.read_csv(file_path, engine='pyarrow')
     print(f"Dados carregados: {df.shape[0]} linhas, {df.shape[1]} colunas")
     return df
 
 
+# Índices de treino/teste já calculados, por (n, hash de y, test_size, seed)
+_SPLIT_CACHE = {}
+
+
+def _get_strat_indices(y, test_size, seed):
+    """
+    Índices do split estratificado, calculados uma vez por target.
+    
+    Chamadas repetidas com o mesmo y (ex.: busca de hiperparâmetros) reusam
+    o resultado em vez de refazer a estratificação.
+    
+    Args:
+        y: Series com o target
+        test_size: Proporção de dados para teste
+        seed: Semente do split
+    
+    Returns:
+        Tupla (índices de treino, índices de teste)
+    """
+    y_hash = hashlib.sha1(
+        pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes()
+    ).hexdigest()
+    cache_key = (len(y), y_hash, test_size, seed)
+    
+    if cache_key not in _SPLIT_CACHE:
+        _SPLIT_CACHE[cache_key] = train_test_split(
+            np.arange(len(y)), test_size=test_size, random_state=seed, stratify=y
+        )
+    
+    return _SPLIT_CACHE[cache_key]
+
+
 def prepare_train_test_split(df, target_column, test_size=TEST_SIZE):
     """
     Separa dados em treino e teste.
@@ -48,10 +116,10 @@ def prepare_train_test_split(df, target_column, test_size=TEST_SIZE):
     X = df.drop(columns=[target_column])
     y = df[target_column]
     
-    # Split treino/teste
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=RANDOM_STATE, stratify=y
-    )
+    # Split treino/teste (índices estratificados em cache)
+    train_idx, test_idx = _get_strat_indices(y, test_size, RANDOM_STATE)
+    X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+    y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
     
     print(f"Treino: {len(X_train)} amostras")
     print(f"Teste: {len(X_test)} amostras")
@@ -97,8 +165,46 @@ def save_model(model, file_path=None):
         file_path = MODEL_FILE
     
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(model, file_path)
+    # Sem compressão: o carregamento não paga o custo de descompressão
+    joblib.dump(model, file_path, compress=0, protocol=5)
     print(f"Modelo salvo em: {file_path}")
+    
+    if SKL2ONNX_AVAILABLE:
+        export_onnx(model, file_path.with_suffix('.onnx'))
+
+
+def export_onnx(model, onnx_path):
+    """
+    Exporta o modelo para ONNX, para inferência com o onnxruntime.
+    
+    As probabilidades saem como tensor (sem ZipMap). As classes e os nomes
+    das features do modelo ficam nos metadados ('classes' e 'feature_names',
+    em JSON; null se o modelo foi treinado sem nomes), usados pelo
+    predict.OnnxModel.
+    
+    Args:
+        model: Modelo treinado (com n_features_in_ e classes_)
+        onnx_path: Caminho do arquivo .onnx
+    """
+    onx = convert_sklearn(
+        model,
+        initial_types=[('X', FloatTensorType([None, model.n_features_in_]))],
+        options={id(model): {'zipmap': False}}
+    )
+    
+    classes = onx.metadata_props.add()
+    classes.key = 'classes'
+    classes.value = json.dumps(model.classes_.tolist())
+    
+    feature_names = onx.metadata_props.add()
+    feature_names.key = 'feature_names'
+    feature_names.value = json.dumps(
+        model.feature_names_in_.tolist() if hasattr(model, 'feature_names_in_') else None
+    )
+    
+    with open(onnx_path, 'wb') as f:
+        f.write(onx.SerializeToString())
+    print(f"Modelo ONNX salvo em: {onnx_path}")
 
 
 def main(target_column='target'):